@@ -6,13 +6,48 @@ class InsultFilterPyroClient:
         self.server = Pyro4.Proxy(uri)
 
     def submit_text(self, text):
-        """Submit text for filtering"""
-        self.server.submit_text(text)
+        """Submit text for filtering, returns its ticket"""
+        return self.server.submit_text(text)
+
+    def submit_texts(self, texts):
+        """Submit a batch of texts for filtering in a single call"""
+        return self.server.submit_texts(list(texts))
+
+    def get_result(self, ticket):
+        """Get the filtered text for a ticket, None while pending"""
+        return self.server.get_result(ticket)
+
+    def wait_result(self, ticket, timeout=None):
+        """Wait until the text for a ticket has been filtered"""
+        return self.server.wait_result(ticket, timeout)
 
     def get_results(self):
         """Get filtered results"""
         return self.server.get_results()
 
+    def filter_stream(self, chunks):
+        """Filter a large document chunk by chunk, yielding the censored output"""
+        stream_id = self.server.open_stream()
+        for chunk in chunks:
+            censored = self.server.feed_stream(stream_id, chunk)
+            if censored:
+                yield censored
+        tail = self.server.close_stream(stream_id)
+        if tail:
+            yield tail
+
+    def get_results_page(self, cursor=0, limit=100):
+        """Get one page of filtered results"""
+        return self.server.get_results_page(cursor, limit)
+
+    def get_results_since(self, seq):
+        """Get only the filtered results numbered seq onwards"""
+        return self.server.get_results_since(seq)
+
+    def get_cache_stats(self):
+        """Get the server's filter cache counters"""
+        return self.server.get_cache_stats()
+
 if __name__ == "__main__":
     client = InsultFilterPyroClient()
 
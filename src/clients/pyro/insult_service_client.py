@@ -30,6 +30,14 @@ class InsultServicePyroClient:
         """Get filtered results"""
         return self.server.get_all_insults()
 
+    def get_insults_page(self, cursor=0, limit=100):
+        """Get one page of insults"""
+        return self.server.get_insults_page(cursor, limit)
+
+    def get_insults_since(self, seq):
+        """Get only the insults added after the first seq ones"""
+        return self.server.get_insults_since(seq)
+
 if __name__ == "__main__":
     client = InsultServicePyroClient()
 
@@ -0,0 +1,93 @@
+import os
+import threading
+
+import pika
+
+DIRECT_REPLY_TO = 'amq.rabbitmq.reply-to'
+
+
+class PooledChannel:
+    """A BlockingConnection and channel that already consume their reply queue
+
+    With direct reply-to the replies come through RabbitMQ's
+    amq.rabbitmq.reply-to pseudo-queue, so no queue is declared at all;
+    otherwise one exclusive callback queue is declared once per connection.
+    The client currently holding the channel sets on_reply.
+    """
+
+    def __init__(self, host, port, direct_reply_to=True):
+        self.connection = pika.BlockingConnection(pika.ConnectionParameters(host, port))
+        self.channel = self.connection.channel()
+        if direct_reply_to:
+            self.reply_queue = DIRECT_REPLY_TO
+        else:
+            self.reply_queue = self.channel.queue_declare(queue='', exclusive=True).method.queue
+        self.on_reply = None
+        self.tx_channel = None
+        # Direct reply-to requires auto_ack and must be consumed before the first publish
+        self.channel.basic_consume(queue=self.reply_queue, on_message_callback=self.dispatch_reply, auto_ack=True)
+
+    def dispatch_reply(self, ch, method, props, body):
+        if self.on_reply is not None:
+            self.on_reply(ch, method, props, body)
+
+    def transactional_channel(self):
+        """Second channel in tx mode for confirmed one-way publishes, opened on first use"""
+        if self.tx_channel is None or not self.tx_channel.is_open:
+            self.tx_channel = self.connection.channel()
+            self.tx_channel.tx_select()
+        return self.tx_channel
+
+    @property
+    def is_open(self):
+        return self.connection.is_open and self.channel.is_open
+
+    def close(self):
+        if self.connection.is_open:
+            self.connection.close()
+
+
+class ConnectionPool:
+    """Idle PooledChannels for one broker, reused across client instances"""
+
+    def __init__(self, host, port, direct_reply_to=True, max_idle=8):
+        self.host = host
+        self.port = port
+        self.direct_reply_to = direct_reply_to
+        self.max_idle = max_idle
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            while self.idle:
+                pooled = self.idle.pop()
+                if pooled.is_open:
+                    return pooled
+        return PooledChannel(self.host, self.port, self.direct_reply_to)
+
+    def release(self, pooled):
+        pooled.on_reply = None
+        with self.lock:
+            if pooled.is_open and len(self.idle) < self.max_idle:
+                self.idle.append(pooled)
+                return
+        pooled.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for pooled in idle:
+            pooled.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(host, port, direct_reply_to=True):
+    """Process-wide pool per broker; pika connections must not cross a fork, so pools are per pid"""
+    key = (os.getpid(), host, port, direct_reply_to)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(host, port, direct_reply_to)
+        return _pools[key]
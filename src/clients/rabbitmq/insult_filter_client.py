@@ -1,61 +1,154 @@
-import json
 import time
 import uuid
-import pika
+from collections import OrderedDict
 
-class InsultFilterRabbitMQClient:
-    def __init__(self, host = "127.0.0.1", port = 5672):
-        self.connection = pika.BlockingConnection(pika.ConnectionParameters(host, port))
-        self.channel = self.connection.channel()
-        self.callback_queue = self.channel.queue_declare(queue='', exclusive=True).method.queue
-        self.channel.basic_consume(queue=self.callback_queue, on_message_callback=self.on_response, auto_ack=True)
-        self.responses = {}
+import pika
+from clients.rabbitmq.rpc_client import RabbitMQRpcClient, RpcFuture
 
-    def on_response(self, ch, method, props, body):
-        """Maneja respuestas RPC"""
-        if props.correlation_id in self.responses:
-            self.responses[props.correlation_id] = body.decode()
+class InsultFilterRabbitMQClient(RabbitMQRpcClient):
+    def __init__(self, host="127.0.0.1", port=5672, codec=None, direct_reply_to=True, pooled=True,
+                 max_in_flight=100, timeout=5, confirm_batch=None, confirm_interval=0.1):
+        super().__init__(host, port, codec, direct_reply_to, pooled, max_in_flight, timeout)
+        # Con confirm_batch los envíos sin respuesta se confirman por lotes: tx_commit cada N
+        # mensajes, cuando el lote tiene más de confirm_interval segundos o antes de cualquier RPC
+        self.confirm_batch = confirm_batch
+        self.confirm_interval = confirm_interval
+        self.unconfirmed = 0
+        self.unconfirmed_since = None
+        # Textos filtrados que llegaron con la respuesta de submit_text, por ticket
+        self.results = OrderedDict()
+        self.results_maxlen = 10000
 
     def submit_text(self, text):
-        """Envía texto para ser filtrado (no devuelve el resultado filtrado)"""
-        self.call_rpc_method('insult_filter', 'submit_text', text)
+        """Envía texto para ser filtrado, devuelve su ticket"""
+        return self.submit_text_async(text).result()
 
-    def get_results(self):
-        """Obtiene todos los textos filtrados acumulados"""
-        return json.loads(self.call_rpc_method('insult_filter', 'get_results'))
-
-    def call_rpc_method(self, exchange, routing_key, body=""):
-        """Realiza una llamada RPC genérica"""
-        corr_id = str(uuid.uuid4())
-        self.responses[corr_id] = None
-
-        self.channel.basic_publish(
-            exchange=exchange,
-            routing_key=routing_key,
-            properties=pika.BasicProperties(
-                reply_to=self.callback_queue,
-                correlation_id=corr_id,
-                delivery_mode=1,
-
-            ),
-            body=body.encode() if body else ''
+    def submit_text_nowait(self, text):
+        """Envía texto sin respuesta del servidor; el ticket lo genera el cliente"""
+        ticket = uuid.uuid4().hex
+        body, content_type = self.codec.pack(text)
+        channel = self.pooled.transactional_channel() if self.confirm_batch else self.channel
+        channel.basic_publish(
+            exchange='insult_filter',
+            routing_key='submit_text',
+            properties=pika.BasicProperties(message_id=ticket, content_type=content_type, delivery_mode=1),
+            body=body
         )
+        if self.confirm_batch:
+            if not self.unconfirmed:
+                self.unconfirmed_since = time.monotonic()
+            self.unconfirmed += 1
+            if (self.unconfirmed >= self.confirm_batch
+                    or time.monotonic() - self.unconfirmed_since >= self.confirm_interval):
+                self.flush()
+        return ticket
 
-        start_time = time.time()
-        while self.responses[corr_id] is None:
-            self.connection.process_data_events()
-            if time.time() - start_time > 5:
-                raise TimeoutError("No response received")
+    def flush(self):
+        """Confirma los envíos sin respuesta pendientes; lanza excepción si el broker los rechaza"""
+        if self.unconfirmed:
+            self.pooled.transactional_channel().tx_commit()
+            self.unconfirmed = 0
 
-        return self.responses.pop(corr_id)
+    def call_rpc_method_async(self, exchange, routing_key, payload=None, timeout=None, headers=None):
+        """Confirma antes los envíos sin respuesta, para que la réplica ya los tenga al responder"""
+        self.flush()
+        return super().call_rpc_method_async(exchange, routing_key, payload, timeout, headers)
 
     def close(self):
-        self.connection.close()
+        self.flush()
+        super().close()
+
+    def submit_text_async(self, text):
+        """Envía texto sin esperar la respuesta, devuelve un future con el ticket
+
+        La réplica filtra antes de responder, así que la respuesta trae también
+        el texto filtrado y se guarda para wait_result.
+        """
+        reply_future = self.call_rpc_method_async('insult_filter', 'submit_text', text,
+                                                  headers={'deliver_result': True})
+        ticket_future = RpcFuture(self)
+
+        def keep_result(future):
+            if future.cancelled():
+                ticket_future.cancel()
+            elif future.exception(0) is not None:
+                ticket_future.set_exception(future.exception(0))
+            else:
+                reply = future.result(0)
+                self.results[reply['ticket']] = reply['result']
+                while len(self.results) > self.results_maxlen:
+                    self.results.popitem(last=False)
+                ticket_future.set_result(reply['ticket'])
+
+        reply_future.add_done_callback(keep_result)
+        return ticket_future
+
+    def submit_texts(self, texts):
+        """Envía un lote de textos en un único mensaje, devuelve sus tickets"""
+        return self.call_rpc_method('insult_filter', 'submit_texts', list(texts))
+
+    def get_results_page(self, cursor=0, limit=100):
+        """Obtiene una página de textos filtrados"""
+        return self.call_rpc_method('insult_filter', 'get_results_page', {'cursor': cursor, 'limit': limit})
+
+    def get_results_since(self, seq):
+        """Obtiene solo los textos filtrados a partir de la secuencia seq"""
+        return self.call_rpc_method('insult_filter', 'get_results_since', {'seq': seq})
+
+    def get_result(self, ticket):
+        """Obtiene el texto filtrado de un ticket (None si no está disponible)"""
+        return self.call_rpc_method('insult_filter', 'get_result', ticket)
+
+    def wait_result(self, ticket, timeout=None, poll_interval=0.05):
+        """Texto filtrado de un ticket, esperando hasta timeout segundos (None: sin límite)
+
+        El de submit_text ya llegó con la respuesta del envío, así que no se
+        pregunta a ninguna réplica. Los demás tickets (submit_text_nowait u
+        otros clientes) se consultan con get_result cada poll_interval hasta
+        que alguna réplica los tenga filtrados o venza el plazo.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            if ticket in self.results:
+                return self.results.pop(ticket)
+            result = self.get_result(ticket)
+            if result is not None:
+                return result
+            remaining = deadline - time.monotonic() if deadline is not None else poll_interval
+            if remaining <= 0:
+                return None
+            # Espera procesando eventos: mantiene el heartbeat y recibe otras respuestas
+            self.connection.process_data_events(time_limit=min(poll_interval, remaining))
+
+    def get_results(self):
+        """Obtiene todos los textos filtrados acumulados"""
+        return self.call_rpc_method('insult_filter', 'get_results')
+
+    def get_cache_stats(self):
+        """Obtiene los contadores de la caché de filtrado de la réplica que atiende la petición"""
+        return self.call_rpc_method('insult_filter', 'get_cache_stats')
+
+    def stream_rpc(self, request):
+        response = self.call_rpc_method('insult_filter', 'stream', request)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response
+
+    def filter_stream(self, chunks):
+        """Filtra un documento grande por trozos, devolviendo la salida censurada a medida"""
+        stream_id = self.stream_rpc({'op': 'open'})['stream_id']
+        for chunk in chunks:
+            censored = self.stream_rpc({'op': 'feed', 'stream_id': stream_id, 'text': chunk})['text']
+            if censored:
+                yield censored
+        tail = self.stream_rpc({'op': 'close', 'stream_id': stream_id})['text']
+        if tail:
+            yield tail
 
 if __name__ == "__main__":
     client = InsultFilterRabbitMQClient()
-    client.submit_text("Hello world idiot")
+    ticket = client.submit_text("Hello world idiot")
     client.submit_text("Hello world stupid")
-    time.sleep(1)
+    print(client.wait_result(ticket))
     print(client.get_results())
     client.close()
@@ -1,63 +1,44 @@
-import json
-import time
-import uuid
 from time import sleep
 
-import pika
+from clients.rabbitmq.rpc_client import RabbitMQRpcClient
 
-class InsultServiceRabbitMQClient:
-    def __init__(self, host = "127.0.0.1", port=5672):
-        self.connection = pika.BlockingConnection(pika.ConnectionParameters(host, port))
-        self.channel = self.connection.channel()
+class InsultServiceRabbitMQClient(RabbitMQRpcClient):
+    def __init__(self, host = "127.0.0.1", port=5672, codec=None, direct_reply_to=True, pooled=True):
+        super().__init__(host, port, codec, direct_reply_to, pooled)
 
         self.channel.exchange_declare(exchange='insult_broadcast', exchange_type='fanout')
 
-        self.callback_queue = self.channel.queue_declare(queue='', exclusive=True).method.queue
         self.broadcast_queue = self.channel.queue_declare(queue='', exclusive=True).method.queue
 
         self.channel.queue_bind(queue=self.broadcast_queue, exchange='insult_broadcast')
-        self.channel.basic_consume(queue=self.callback_queue, on_message_callback=self.on_response, auto_ack=True)
-        self.channel.basic_consume(queue=self.broadcast_queue, on_message_callback=self.recive_insult, auto_ack=True)
-
-        self.responses = {}
+        self.broadcast_consumer_tag = self.channel.basic_consume(queue=self.broadcast_queue,
+                                                                 on_message_callback=self.recive_insult,
+                                                                 auto_ack=True)
 
     def recive_insult(self, ch, method, props, body):
         print(body.decode())
 
-    def on_response(self, ch, method, props, body):
-        if props.correlation_id in self.responses:
-            self.responses[props.correlation_id] = body.decode()
-
     def add_insult(self, insult):
         self.call_rpc_method('insult_service', 'add_insult', insult)
 
-    def get_all_insults(self):
-        return json.loads(self.call_rpc_method('insult_service', 'get_all_insults'))
+    def add_insult_async(self, insult):
+        """Envía un insulto sin esperar la respuesta, devuelve un future"""
+        return self.call_rpc_method_async('insult_service', 'add_insult', insult)
 
-    def call_rpc_method(self, exchange, routing_key, body=""):
-        """Realiza una llamada RPC genérica"""
-        corr_id = str(uuid.uuid4())
-        self.responses[corr_id] = None
-
-        self.channel.basic_publish(
-            exchange=exchange,
-            routing_key=routing_key,
-            properties=pika.BasicProperties(
-                reply_to=self.callback_queue,
-                correlation_id=corr_id,
-                delivery_mode=1,
+    def get_all_insults(self):
+        return self.call_rpc_method('insult_service', 'get_all_insults')
 
-            ),
-            body=body.encode() if body else ''
-        )
+    def get_insults_page(self, cursor=0, limit=100):
+        return self.call_rpc_method('insult_service', 'get_insults_page', {'cursor': cursor, 'limit': limit})
 
-        start_time = time.time()
-        while self.responses[corr_id] is None:
-            self.connection.process_data_events()
-            if time.time() - start_time > 5:
-                raise TimeoutError("No response received")
+    def get_insults_since(self, seq):
+        return self.call_rpc_method('insult_service', 'get_insults_since', {'seq': seq})
 
-        return self.responses.pop(corr_id)
+    def close(self):
+        """Deja de escuchar la difusión antes de devolver el canal al pool"""
+        self.channel.basic_cancel(self.broadcast_consumer_tag)
+        self.channel.queue_delete(self.broadcast_queue)
+        super().close()
 
 if __name__ == "__main__":
     client = InsultServiceRabbitMQClient()
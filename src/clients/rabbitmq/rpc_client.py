@@ -0,0 +1,128 @@
+import time
+import uuid
+from concurrent.futures import Future
+
+import pika
+from clients.rabbitmq.connection_pool import PooledChannel, get_pool
+from common.codec import get_codec, unpack
+
+
+class RpcFuture(Future):
+    """Future de una llamada RPC; esperar su resultado procesa los eventos de la conexión"""
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+    def result(self, timeout=None):
+        self.client.wait_for(self, timeout)
+        return super().result(0)
+
+    def exception(self, timeout=None):
+        self.client.wait_for(self, timeout)
+        return super().exception(0)
+
+
+class RabbitMQRpcClient:
+    """RPC sobre RabbitMQ con una conexión y canal de larga duración
+
+    Con pooled=True el canal se toma del pool del proceso y vuelve a él en
+    close(), así que crear un cliente por petición ya no abre conexión ni
+    declara colas. Con direct_reply_to las respuestas llegan por
+    amq.rabbitmq.reply-to en lugar de una cola exclusiva propia.
+
+    Las llamadas se pueden encadenar sin esperar (call_rpc_method_async):
+    hasta max_in_flight peticiones pendientes, cada una con su timeout. Como
+    BlockingConnection no es thread-safe, un cliente se usa desde un solo hilo.
+    """
+
+    def __init__(self, host="127.0.0.1", port=5672, codec=None, direct_reply_to=True, pooled=True,
+                 max_in_flight=100, timeout=5):
+        self.codec = get_codec(codec)
+        self.pool = get_pool(host, port, direct_reply_to) if pooled else None
+        self.pooled = self.pool.acquire() if self.pool else PooledChannel(host, port, direct_reply_to)
+        self.pooled.on_reply = self.on_response
+        self.connection = self.pooled.connection
+        self.channel = self.pooled.channel
+        self.callback_queue = self.pooled.reply_queue
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.pending = {}
+
+    def on_response(self, ch, method, props, body):
+        """Maneja respuestas RPC resolviendo el future de su correlation_id"""
+        entry = self.pending.pop(props.correlation_id, None)
+        if entry is None:
+            return
+        future, _ = entry
+        try:
+            response = unpack(body, props.content_type)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        # Los servidores responden {'status': 'error'} a las peticiones que no pueden decodificar
+        if isinstance(response, dict) and response.get('status') == 'error':
+            future.set_exception(RuntimeError(response.get('message')))
+        else:
+            future.set_result(response)
+
+    def process_events(self):
+        """Espera eventos hasta el próximo vencimiento y expira las llamadas sin respuesta"""
+        if not self.pending:
+            self.connection.process_data_events(time_limit=0)
+            return
+        now = time.monotonic()
+        next_deadline = min(deadline for _, deadline in self.pending.values())
+        self.connection.process_data_events(time_limit=max(0, next_deadline - now))
+
+        now = time.monotonic()
+        for corr_id, (future, deadline) in list(self.pending.items()):
+            if deadline <= now:
+                del self.pending[corr_id]
+                future.set_exception(TimeoutError("No response received"))
+
+    def wait_for(self, future, timeout=None):
+        """Procesa eventos hasta que future se resuelva o pase timeout"""
+        end = time.monotonic() + timeout if timeout is not None else None
+        while not future.done():
+            if end is not None and time.monotonic() >= end:
+                return
+            self.process_events()
+
+    def call_rpc_method_async(self, exchange, routing_key, payload=None, timeout=None, headers=None):
+        """Publica una llamada RPC sin esperar, devuelve un future con la respuesta"""
+        while len(self.pending) >= self.max_in_flight:
+            self.process_events()
+
+        corr_id = str(uuid.uuid4())
+        future = RpcFuture(self)
+        body, content_type = self.codec.pack(payload) if payload is not None else (b'', self.codec.content_type)
+
+        self.channel.basic_publish(
+            exchange=exchange,
+            routing_key=routing_key,
+            properties=pika.BasicProperties(
+                reply_to=self.callback_queue,
+                correlation_id=corr_id,
+                content_type=content_type,
+                delivery_mode=1,
+                headers=headers,
+            ),
+            body=body
+        )
+        self.pending[corr_id] = (future, time.monotonic() + (timeout or self.timeout))
+        return future
+
+    def call_rpc_method(self, exchange, routing_key, payload=None, timeout=None):
+        """Realiza una llamada RPC genérica, codificando payload con el códec del cliente"""
+        return self.call_rpc_method_async(exchange, routing_key, payload, timeout).result()
+
+    def close(self):
+        """Devuelve el canal al pool (o cierra la conexión si no se usa pool)"""
+        for future, _ in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        if self.pool:
+            self.pool.release(self.pooled)
+        else:
+            self.pooled.close()
@@ -0,0 +1,153 @@
+import asyncio
+import uuid
+
+import redis.asyncio as aioredis
+from clients.redis.async_rpc_client import AsyncRedisRpcClient
+
+class AsyncInsultFilterRedisClient(AsyncRedisRpcClient):
+    """asyncio version of InsultFilterRedisClient, every method is a coroutine
+
+    wait_result calls share one dedicated connection: a watcher task BLPOPs
+    every awaited ticket key at once, so any number of waits are in flight
+    without holding the request pool's connections.
+    """
+
+    def __init__(self, host='127.0.0.1', port=6379, max_connections=4, codec=None, ticket_ttl=300):
+        super().__init__(host, port, 'insult_filter:requests', 'insult_filter', max_connections=max_connections,
+                         codec=codec)
+        self.ticket_prefix = 'insult_filter:result:'
+        # Must match the server's ticket_ttl: a result popped by the watcher is pushed back with it
+        self.ticket_ttl = ticket_ttl
+        waits_pool = aioredis.BlockingConnectionPool(host=host, port=port, db=0, decode_responses=True,
+                                                     max_connections=1)
+        self.waits = aioredis.StrictRedis(connection_pool=waits_pool)
+        self.wake_key = f"insult_filter:wake:{uuid.uuid4().hex}"
+        self.wake_pending = False
+        self.result_waiters = {}
+        self.watch_task = None
+
+    async def submit_text(self, text):
+        """Send text to be filtered, returns its ticket"""
+        return (await self.send_request({'action': 'submit_text', 'text': text})).get('ticket')
+
+    def submit_text_async(self, text):
+        """Send text without waiting for the reply, returns a Future with the response"""
+        return self.send_request_async({'action': 'submit_text', 'text': text})
+
+    async def submit_texts(self, texts):
+        """Send a batch of texts to be filtered in a single request"""
+        return (await self.send_request({'action': 'submit_texts', 'texts': list(texts)})).get('tickets')
+
+    async def get_result(self, ticket):
+        """Read the filtered text for a ticket straight from Redis, None while pending"""
+        return await self.redis.lindex(self.ticket_prefix + ticket, 0)
+
+    async def wait_result(self, ticket, timeout=None):
+        """Wait until the text for a ticket has been filtered, None if timeout expires first"""
+        key = self.ticket_prefix + ticket
+        future = asyncio.get_running_loop().create_future()
+        self.result_waiters.setdefault(key, []).append(future)
+        if self.watch_task is None:
+            self.watch_task = asyncio.create_task(self.watch_results())
+        elif not self.wake_pending:
+            # Interrupt the watcher's BLPOP so it starts blocking on this key too
+            self.wake_pending = True
+            await self.redis.rpush(self.wake_key, 1)
+        try:
+            return await asyncio.wait_for(future, timeout or None)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self.result_waiters.get(key)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self.result_waiters[key]
+
+    async def watch_results(self):
+        """Watcher task: one BLPOP over the wake key and every awaited ticket key
+
+        Results tend to arrive in bursts, so after each wakeup the other
+        awaited keys are read in one pipelined sweep before blocking again.
+        """
+        while True:
+            try:
+                self.wake_pending = False
+                key, value = await self.waits.blpop([self.wake_key, *self.result_waiters], timeout=0)
+                pipe = self.waits.pipeline(transaction=False)
+                if key != self.wake_key:
+                    # Put the result back so get_result and other clients still find it
+                    pipe.lpush(key, value)
+                    pipe.expire(key, self.ticket_ttl)
+                    self.resolve_waiters(key, value)
+                keys = list(self.result_waiters)
+                for waited_key in keys:
+                    pipe.lindex(waited_key, 0)
+                replies = await pipe.execute()
+                for waited_key, result in zip(keys, replies[len(replies) - len(keys):]):
+                    if result is not None:
+                        self.resolve_waiters(waited_key, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error watching results: {e}")
+                await asyncio.sleep(1)
+
+    def resolve_waiters(self, key, value):
+        for future in self.result_waiters.pop(key, []):
+            if not future.done():
+                future.set_result(value)
+
+    async def get_results(self):
+        """Retrieve filtered results"""
+        return await self.send_request({'action': 'get_results'})
+
+    async def stream_request(self, request_data):
+        response = await self.send_request(request_data)
+        if response['status'] != 'success':
+            raise RuntimeError(response['message'])
+        return response
+
+    async def filter_stream(self, chunks):
+        """Filter a large document chunk by chunk, yielding the censored output"""
+        stream_id = (await self.stream_request({'action': 'open_stream'}))['stream_id']
+        for chunk in chunks:
+            censored = (await self.stream_request({'action': 'feed_stream', 'stream_id': stream_id,
+                                                   'text': chunk}))['text']
+            if censored:
+                yield censored
+        tail = (await self.stream_request({'action': 'close_stream', 'stream_id': stream_id}))['text']
+        if tail:
+            yield tail
+
+    async def get_results_page(self, cursor=0, limit=100):
+        """Retrieve one page of filtered results"""
+        return await self.send_request({'action': 'get_results_page', 'cursor': cursor, 'limit': limit})
+
+    async def get_results_since(self, seq):
+        """Retrieve only the filtered results numbered seq onwards"""
+        return await self.send_request({'action': 'get_results_since', 'seq': seq})
+
+    async def get_cache_stats(self):
+        """Retrieve the server's filter cache counters"""
+        return await self.send_request({'action': 'get_cache_stats'})
+
+    async def close(self):
+        if self.watch_task:
+            self.watch_task.cancel()
+            await asyncio.gather(self.watch_task, return_exceptions=True)
+            self.watch_task = None
+        await self.redis.delete(self.wake_key)
+        await self.waits.aclose()
+        await super().close()
+
+async def main():
+    client = AsyncInsultFilterRedisClient()
+
+    tickets = await asyncio.gather(*(client.submit_text(f"Hello world idiot {i}") for i in range(1000)))
+    print(await client.wait_result(tickets[-1], 5))
+    print(await client.get_results())
+    await client.close()
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+import asyncio
+
+from clients.redis.async_rpc_client import AsyncRedisRpcClient
+
+class AsyncInsultServiceRedisClient(AsyncRedisRpcClient):
+    """asyncio version of InsultServiceRedisClient, every method is a coroutine"""
+
+    def __init__(self, host='127.0.0.1', port=6379, max_connections=4, codec=None):
+        super().__init__(host, port, 'insult_service:requests', 'insult_service', max_connections=max_connections,
+                         reserved_connections=1, codec=codec)
+        self.notify_channel = 'insult_service:notify'
+        # Local copy of the service's insults, revalidated against its version on
+        # every read so only the insults added since ours are fetched
+        self.insults_cache = []
+        self.insults_version = 0
+
+    def start(self):
+        if not self.tasks:
+            super().start()
+            self.tasks.append(asyncio.create_task(self.check_notifications()))
+
+    async def check_notifications(self):
+        try:
+            pubsub = self.redis.pubsub()
+            await pubsub.subscribe(self.notify_channel)
+
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    print(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            pass
+
+    async def add_insult(self, insult):
+        """Send text to be filtered"""
+        return await self.send_request({'action': 'add_insult', 'text': insult})
+
+    def add_insult_async(self, insult):
+        """Send an insult without waiting for the reply, returns a Future with the response"""
+        return self.send_request_async({'action': 'add_insult', 'text': insult})
+
+    def apply_insults_delta(self, delta):
+        """Append a get_insults_since style delta, dropping the part already cached"""
+        start = delta['next_seq'] - len(delta['items'])
+        if start <= self.insults_version < delta['next_seq']:
+            self.insults_cache.extend(delta['items'][self.insults_version - start:])
+            self.insults_version = delta['next_seq']
+
+    async def get_all_insults(self):
+        """Retrieve all insults from the local copy, fetching only the ones added since"""
+        response = await self.get_insults_version()
+        if response['status'] != 'success':
+            return response
+        if response['version'] > self.insults_version:
+            response = await self.get_insults_since(self.insults_version)
+            if response['status'] != 'success':
+                return response
+            self.apply_insults_delta(response['results'])
+        return {'status': 'success', 'results': self.insults_cache[:]}
+
+    async def get_insults_version(self):
+        """Retrieve the service's insults version"""
+        return await self.send_request({'action': 'get_insults_version'})
+
+    async def get_insults_page(self, cursor=0, limit=100):
+        """Retrieve one page of insults"""
+        return await self.send_request({'action': 'get_insults_page', 'cursor': cursor, 'limit': limit})
+
+    async def get_insults_since(self, seq):
+        """Retrieve only the insults added after the first seq ones"""
+        return await self.send_request({'action': 'get_insults_since', 'seq': seq})
+
+async def main():
+    client = AsyncInsultServiceRedisClient()
+
+    print(await asyncio.gather(*(client.add_insult(insult) for insult in
+                                 ["Idiot", "Tonto", "Burru", "Capullu", "Retresat"])))
+    print(await client.get_all_insults())
+    await client.close()
+
+if __name__ == '__main__':
+    asyncio.run(main())
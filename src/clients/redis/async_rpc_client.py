@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+import redis.asyncio as aioredis
+from common.codec import sniff, structured_codec
+
+
+class AsyncRedisRpcClient:
+    """asyncio counterpart of RedisRpcClient
+
+    Requests are queued and flushed by a writer task as one multi-value RPUSH,
+    and a reader task BLPOPs the client's reply list and resolves the
+    matching Future, so thousands of coroutines can have requests in flight
+    over a pool of max_connections connections.
+    """
+
+    def __init__(self, host, port, request_queue, reply_prefix, timeout=5, max_connections=4,
+                 batch_size=500, reserved_connections=0, codec=None):
+        # Pub/sub holds a connection for good, so reserved ones are kept on top of max_connections
+        pool = aioredis.BlockingConnectionPool(host=host, port=port, db=0, decode_responses=True,
+                                               max_connections=max_connections + reserved_connections)
+        self.redis = aioredis.StrictRedis(connection_pool=pool)
+        # Requests and replies are encoded by the codec, so they skip decode_responses;
+        # one connection for the writer task and one held by the reader's BLPOP
+        wire_pool = aioredis.BlockingConnectionPool(host=host, port=port, db=0, max_connections=2)
+        self.wire = aioredis.StrictRedis(connection_pool=wire_pool)
+        self.codec = structured_codec(codec)
+        self.request_queue = request_queue
+        self.reply_queue = f"{reply_prefix}:replies:{uuid.uuid4().hex}"
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.pending = {}
+        self.outgoing = None
+        self.tasks = []
+
+    def start(self):
+        """Start the reader/writer tasks on the running loop (done on first request)"""
+        if not self.tasks:
+            self.outgoing = asyncio.Queue()
+            self.tasks = [asyncio.create_task(self.read_replies()), asyncio.create_task(self.write_requests())]
+
+    async def read_replies(self):
+        """Reader task: dispatch every reply to the Future waiting on its correlation id"""
+        while True:
+            try:
+                item = await self.wire.blpop([self.reply_queue], timeout=1)
+                if item is None:
+                    continue
+                reply = sniff(item[1]).decode(item[1])
+                future = self.pending.pop(reply['correlation_id'], None)
+                if future is not None and not future.done():
+                    future.set_result(reply['response'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error reading replies: {e}")
+
+    async def write_requests(self):
+        """Writer task: send every request queued since the last flush in one RPUSH"""
+        while True:
+            payloads = [await self.outgoing.get()]
+            while len(payloads) < self.batch_size and not self.outgoing.empty():
+                payloads.append(self.outgoing.get_nowait())
+            try:
+                await self.push_requests(payloads)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                for payload in payloads:
+                    future = self.pending.pop(sniff(payload).decode(payload)['correlation_id'], None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+
+    async def push_requests(self, payloads):
+        await self.wire.rpush(self.request_queue, *payloads)
+
+    def send_request_async(self, request_data):
+        """Queue a request without waiting, returns an asyncio Future with the response"""
+        self.start()
+        correlation_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self.pending[correlation_id] = future
+
+        request_data['correlation_id'] = correlation_id
+        request_data['reply_to'] = self.reply_queue
+        self.outgoing.put_nowait(self.codec.encode(request_data))
+        return future
+
+    async def send_request(self, request_data):
+        future = self.send_request_async(request_data)
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self.pending.pop(request_data['correlation_id'], None)
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        await self.redis.delete(self.reply_queue)
+        await self.redis.aclose()
+        await self.wire.aclose()
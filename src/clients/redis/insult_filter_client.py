@@ -1,49 +1,71 @@
 from time import sleep
 
-import redis
-import json
-import uuid
-
-def sync_response(pubsub):
-    for message in pubsub.listen():
-        if message['type'] == 'message':
-            pubsub.close()
-            return json.loads(message['data'])
-
-class InsultFilterRedisClient:
-    def __init__(self, host='127.0.0.1', port=6379):
-        pool = redis.ConnectionPool(host=host, port=port, db=0, decode_responses=True)
-        self.redis = redis.StrictRedis(connection_pool=pool)
-        self.request_queue = 'insult_filter:requests'
-        self.pubsub = self.redis.pubsub()
-
-    def send_request(self, request_data):
-        response_channel = f"response:{uuid.uuid4()}"
-        self.pubsub.subscribe(response_channel)
-
-        request_data['response_channel'] = response_channel
-        self.redis.rpush(self.request_queue, json.dumps(request_data))
-
-        for message in self.pubsub.listen():
-            if message['type'] == 'message':
-                self.pubsub.unsubscribe(response_channel)
-                return json.loads(message['data'])
+from clients.redis.rpc_client import RedisRpcClient
+
+class InsultFilterRedisClient(RedisRpcClient):
+    def __init__(self, host='127.0.0.1', port=6379, codec=None):
+        super().__init__(host, port, 'insult_filter:requests', 'insult_filter', codec=codec)
+        self.ticket_prefix = 'insult_filter:result:'
 
     def submit_text(self, text):
-        """Send text to be filtered"""
-        return self.send_request({'action': 'submit_text', 'text': text})
+        """Send text to be filtered, returns its ticket"""
+        return self.send_request({'action': 'submit_text', 'text': text}).get('ticket')
+
+    def submit_text_async(self, text):
+        """Send text without waiting for the reply, returns a Future with the response"""
+        return self.send_request_async({'action': 'submit_text', 'text': text})
+
+    def submit_texts(self, texts):
+        """Send a batch of texts to be filtered in a single request"""
+        return self.send_request({'action': 'submit_texts', 'texts': list(texts)}).get('tickets')
+
+    def get_result(self, ticket):
+        """Read the filtered text for a ticket straight from Redis, None while pending"""
+        return self.redis.lindex(self.ticket_prefix + ticket, 0)
+
+    def wait_result(self, ticket, timeout=None):
+        """Block on the ticket key until the text has been filtered"""
+        key = self.ticket_prefix + ticket
+        return self.redis.blmove(key, key, timeout or 0, 'LEFT', 'LEFT')
 
     def get_results(self):
         """Retrieve filtered results"""
         return self.send_request({'action': 'get_results'})
 
-    def close(self):
-        self.redis.close()
+    def stream_request(self, request_data):
+        response = self.send_request(request_data)
+        if response['status'] != 'success':
+            raise RuntimeError(response['message'])
+        return response
+
+    def filter_stream(self, chunks):
+        """Filter a large document chunk by chunk, yielding the censored output"""
+        stream_id = self.stream_request({'action': 'open_stream'})['stream_id']
+        for chunk in chunks:
+            censored = self.stream_request({'action': 'feed_stream', 'stream_id': stream_id, 'text': chunk})['text']
+            if censored:
+                yield censored
+        tail = self.stream_request({'action': 'close_stream', 'stream_id': stream_id})['text']
+        if tail:
+            yield tail
+
+    def get_results_page(self, cursor=0, limit=100):
+        """Retrieve one page of filtered results"""
+        return self.send_request({'action': 'get_results_page', 'cursor': cursor, 'limit': limit})
+
+    def get_results_since(self, seq):
+        """Retrieve only the filtered results numbered seq onwards"""
+        return self.send_request({'action': 'get_results_since', 'seq': seq})
+
+    def get_cache_stats(self):
+        """Retrieve the server's filter cache counters"""
+        return self.send_request({'action': 'get_cache_stats'})
 
 if __name__ == '__main__':
     client = InsultFilterRedisClient()
 
     for i in range(10):
-        print(client.submit_text(f"1 Hello world idiot {i}"))
+        ticket = client.submit_text(f"1 Hello world idiot {i}")
+        print(client.wait_result(ticket, 5))
         print(client.get_results())
         sleep(1)
@@ -0,0 +1,25 @@
+from clients.redis.insult_filter_client import InsultFilterRedisClient
+
+class InsultFilterRedisStreamsClient(InsultFilterRedisClient):
+    """InsultFilterRedisClient that sends its requests to the filter's consumer-group stream"""
+
+    def __init__(self, host='127.0.0.1', port=6379, stream_maxlen=100000, codec=None):
+        super().__init__(host, port, codec)
+        self.stream = 'insult_filter:stream'
+        self.stream_maxlen = stream_maxlen
+
+    def push_request(self, payload):
+        # Approximate trimming keeps XADD O(1) while bounding the stream
+        self.wire.xadd(self.stream, {'data': payload}, maxlen=self.stream_maxlen, approximate=True)
+
+    def get_consumer_lag(self):
+        """Retrieve lag/pending counters of the filter's consumer group"""
+        return self.send_request({'action': 'get_consumer_lag'})
+
+if __name__ == '__main__':
+    client = InsultFilterRedisStreamsClient()
+
+    ticket = client.submit_text("Hello world idiot")
+    print(client.wait_result(ticket, 5))
+    print(client.get_consumer_lag())
+    client.close()
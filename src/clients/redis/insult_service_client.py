@@ -1,18 +1,13 @@
+import json
 import threading
 import time
-from time import sleep
 
-import redis
-import json
-import uuid
+from clients.redis.rpc_client import RedisRpcClient
 
-class InsultServiceRedisClient:
-    def __init__(self, host='127.0.0.1', port=6379):
-        pool = redis.ConnectionPool(host=host, port=port, db=0, decode_responses=True)
-        self.redis = redis.StrictRedis(connection_pool=pool)
-        self.request_queue = 'insult_service:requests'
+class InsultServiceRedisClient(RedisRpcClient):
+    def __init__(self, host='127.0.0.1', port=6379, codec=None):
+        super().__init__(host, port, 'insult_service:requests', 'insult_service', codec=codec)
         self.notify_channel = 'insult_service:notify'
-        self.pubsub = self.redis.pubsub()
 
         def check_notifications():
             try:
@@ -28,27 +23,95 @@ class InsultServiceRedisClient:
         self.thread = threading.Thread(target=check_notifications, daemon=True)
         self.thread.start()
 
-    def send_request(self, request_data):
-        response_channel = f"response:{uuid.uuid4()}"
-        self.pubsub.subscribe(response_channel)
+        # Local copy of the service's insults. While the changes channel is
+        # subscribed it is kept current by the published deltas and reads never
+        # touch Redis; otherwise a read revalidates against the service's version
+        # and fetches only the insults added since ours
+        self.changes_channel = 'insult_service:changes'
+        self.insults_cache = []
+        self.insults_version = 0
+        self.latest_version = 0
+        self.cache_lock = threading.Lock()
+        self.cache_subscribed = False
+        self.cache_synced = False
+        self.changes_thread = threading.Thread(target=self.watch_changes, daemon=True)
+        self.changes_thread.start()
 
-        request_data['response_channel'] = response_channel
-        self.redis.rpush(self.request_queue, json.dumps(request_data))
+    def watch_changes(self):
+        """Apply the deltas published by the service, resubscribing after errors"""
+        while self.running:
+            try:
+                pubsub = self.redis.pubsub()
+                pubsub.subscribe(self.changes_channel)
+                for message in pubsub.listen():
+                    if message['type'] == 'subscribe':
+                        # Deltas from here on are seen, the next read catches up the rest
+                        with self.cache_lock:
+                            self.cache_subscribed = True
+                    elif message['type'] == 'message':
+                        self.apply_insults_delta(json.loads(message['data']))
+            except Exception as e:
+                with self.cache_lock:
+                    self.cache_subscribed = False
+                    self.cache_synced = False
+                if self.running:
+                    print(f"Error watching insult changes: {e}")
+                    time.sleep(1)
 
-        for message in self.pubsub.listen():
-            if message['type'] == 'message':
-                self.pubsub.unsubscribe(response_channel)
-                return json.loads(message['data'])
+    def apply_insults_delta(self, delta):
+        """Append a get_insults_since style delta, dropping the part already cached"""
+        with self.cache_lock:
+            self.latest_version = max(self.latest_version, delta['next_seq'])
+            start = delta['next_seq'] - len(delta['items'])
+            if start > self.insults_version:
+                # Missed a delta, the next read refetches from our version
+                self.cache_synced = False
+                return
+            if delta['next_seq'] > self.insults_version:
+                self.insults_cache.extend(delta['items'][self.insults_version - start:])
+                self.insults_version = delta['next_seq']
 
     def add_insult(self, insult):
         """Send text to be filtered"""
         return self.send_request({'action': 'add_insult', 'text': insult})
+
+    def add_insult_async(self, insult):
+        """Send an insult without waiting for the reply, returns a Future with the response"""
+        return self.send_request_async({'action': 'add_insult', 'text': insult})
+
     def get_all_insults(self):
-        """Retrieve filtered results"""
-        return self.send_request({'action': 'get_all_insults'})
+        """Retrieve all insults from the local copy, fetching only the ones added since"""
+        with self.cache_lock:
+            if self.cache_synced:
+                return {'status': 'success', 'results': self.insults_cache[:]}
+            version = self.insults_version
+            subscribed = self.cache_subscribed
+
+        response = self.get_insults_version()
+        if response['status'] != 'success':
+            return response
+        latest = response['version']
+        if latest > version:
+            response = self.get_insults_since(version)
+            if response['status'] != 'success':
+                return response
+            self.apply_insults_delta(response['results'])
+        with self.cache_lock:
+            self.latest_version = max(self.latest_version, latest)
+            self.cache_synced = subscribed and self.cache_subscribed and self.insults_version >= self.latest_version
+            return {'status': 'success', 'results': self.insults_cache[:]}
+
+    def get_insults_version(self):
+        """Retrieve the service's insults version"""
+        return self.send_request({'action': 'get_insults_version'})
+
+    def get_insults_page(self, cursor=0, limit=100):
+        """Retrieve one page of insults"""
+        return self.send_request({'action': 'get_insults_page', 'cursor': cursor, 'limit': limit})
 
-    def close(self):
-        self.pubsub.close()
+    def get_insults_since(self, seq):
+        """Retrieve only the insults added after the first seq ones"""
+        return self.send_request({'action': 'get_insults_since', 'seq': seq})
 
 if __name__ == '__main__':
     client = InsultServiceRedisClient()
@@ -0,0 +1,82 @@
+import threading
+import uuid
+from concurrent.futures import Future
+
+import redis
+from common.codec import sniff, structured_codec
+
+
+class RedisRpcClient:
+    """Request/reply over Redis with one persistent reply list per client
+
+    Requests carry a correlation id and the client's reply list. A single
+    reader thread BLPOPs that list and resolves the matching Future, so any
+    number of requests can be in flight and no reply can be lost to a
+    late SUBSCRIBE.
+    """
+
+    def __init__(self, host, port, request_queue, reply_prefix, timeout=5, codec=None):
+        pool = redis.ConnectionPool(host=host, port=port, db=0, decode_responses=True)
+        self.redis = redis.StrictRedis(connection_pool=pool)
+        # Requests and replies are encoded by the codec, so they skip decode_responses
+        self.wire = redis.StrictRedis(host=host, port=port, db=0)
+        self.codec = structured_codec(codec)
+        self.request_queue = request_queue
+        self.reply_queue = f"{reply_prefix}:replies:{uuid.uuid4().hex}"
+        self.timeout = timeout
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.running = True
+        self.reply_thread = threading.Thread(target=self.read_replies, daemon=True)
+        self.reply_thread.start()
+
+    def read_replies(self):
+        """Reader thread: dispatch every reply to the Future waiting on its correlation id"""
+        while self.running:
+            try:
+                item = self.wire.blpop([self.reply_queue], timeout=1)
+                if item is None:
+                    continue
+                reply = sniff(item[1]).decode(item[1])
+                with self.pending_lock:
+                    future = self.pending.pop(reply['correlation_id'], None)
+                if future is not None:
+                    future.set_result(reply['response'])
+            except Exception as e:
+                if self.running:
+                    print(f"Error reading replies: {e}")
+
+    def send_request_async(self, request_data):
+        """Queue a request without waiting, returns a Future with the response"""
+        correlation_id = uuid.uuid4().hex
+        future = Future()
+        with self.pending_lock:
+            self.pending[correlation_id] = future
+
+        request_data['correlation_id'] = correlation_id
+        request_data['reply_to'] = self.reply_queue
+        try:
+            self.push_request(self.codec.encode(request_data))
+        except Exception:
+            with self.pending_lock:
+                self.pending.pop(correlation_id, None)
+            raise
+        return future
+
+    def push_request(self, payload):
+        self.wire.rpush(self.request_queue, payload)
+
+    def send_request(self, request_data):
+        future = self.send_request_async(request_data)
+        try:
+            return future.result(self.timeout)
+        finally:
+            with self.pending_lock:
+                self.pending.pop(request_data['correlation_id'], None)
+
+    def close(self):
+        self.running = False
+        self.reply_thread.join()
+        self.redis.delete(self.reply_queue)
+        self.redis.close()
+        self.wire.close()
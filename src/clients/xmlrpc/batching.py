@@ -0,0 +1,92 @@
+import threading
+import time
+import xmlrpc.client
+from concurrent.futures import Future
+
+
+class MulticallBatcher:
+    """Buffer XML-RPC calls and send them together through system.multicall
+
+    Every call returns a Future right away. The buffer is flushed as one
+    HTTP request when it holds max_size calls, when its oldest call has
+    waited max_delay seconds, or when the context exits; each Future then
+    gets its own call's result or Fault.
+    """
+
+    def __init__(self, proxy, max_size=100, max_delay=0.05):
+        self.proxy = proxy
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.calls = []
+        self.oldest = None
+        self.cond = threading.Condition()
+        self.running = True
+        self.timer = threading.Thread(target=self.flush_when_due, daemon=True)
+        self.timer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getattr__(self, name):
+        return lambda *args: self.call(name, *args)
+
+    def call(self, method, *args):
+        future = Future()
+        with self.cond:
+            if not self.calls:
+                self.oldest = time.monotonic()
+                self.cond.notify()
+            self.calls.append((method, args, future))
+            full = len(self.calls) >= self.max_size
+        if full:
+            self.flush()
+        return future
+
+    def take_calls(self):
+        with self.cond:
+            calls, self.calls = self.calls, []
+            return calls
+
+    def flush(self):
+        """Send every buffered call in one system.multicall request"""
+        calls = self.take_calls()
+        if not calls:
+            return
+        multicall = xmlrpc.client.MultiCall(self.proxy)
+        for method, args, _ in calls:
+            getattr(multicall, method)(*args)
+        try:
+            results = multicall()
+        except Exception as e:
+            for _, _, future in calls:
+                future.set_exception(e)
+            return
+        for i, (_, _, future) in enumerate(calls):
+            try:
+                future.set_result(results[i])
+            except xmlrpc.client.Fault as e:
+                future.set_exception(e)
+
+    def flush_when_due(self):
+        """Timer thread: flush once the oldest buffered call has waited max_delay"""
+        while True:
+            with self.cond:
+                while self.running and not self.calls:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                remaining = self.oldest + self.max_delay - time.monotonic()
+                if remaining > 0:
+                    self.cond.wait(remaining)
+                    continue
+            self.flush()
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.timer.join()
+        self.flush()
@@ -1,13 +1,56 @@
 import xmlrpc.client
 
+from clients.xmlrpc.batching import MulticallBatcher
+from clients.xmlrpc.transport import PooledTransport
+
 class InsultFilterXMLRPClient:
-    def __init__(self, host='127.0.0.1', server_port = 8000):
-        self.server = xmlrpc.client.ServerProxy("http://{}:{}".format(host, server_port))
+    def __init__(self, host='127.0.0.1', server_port = 8000, transport=None):
+        self.server = xmlrpc.client.ServerProxy("http://{}:{}".format(host, server_port),
+                                                transport=transport or PooledTransport(), allow_none=True)
 
     def submit_text(self, text):
-        """Submit text for filtering"""
+        """Submit text for filtering, returns its ticket"""
         return self.server.submit_text(text)
 
+    def batch(self, max_size=100, max_delay=0.05):
+        """Batching context: batch.submit_text(text) returns a Future, calls go out via system.multicall"""
+        return MulticallBatcher(self.server, max_size, max_delay)
+
+    def submit_texts(self, texts):
+        """Submit a batch of texts for filtering in a single call"""
+        return self.server.submit_texts(list(texts))
+
+    def get_result(self, ticket):
+        """Get the filtered text for a ticket, None while pending"""
+        return self.server.get_result(ticket)
+
+    def wait_result(self, ticket, timeout=None):
+        """Wait until the text for a ticket has been filtered"""
+        return self.server.wait_result(ticket, timeout)
+
     def get_results(self):
         """Get filtered results"""
-        return self.server.get_results()
\ No newline at end of file
+        return self.server.get_results()
+
+    def filter_stream(self, chunks):
+        """Filter a large document chunk by chunk, yielding the censored output"""
+        stream_id = self.server.open_stream()
+        for chunk in chunks:
+            censored = self.server.feed_stream(stream_id, chunk)
+            if censored:
+                yield censored
+        tail = self.server.close_stream(stream_id)
+        if tail:
+            yield tail
+
+    def get_results_page(self, cursor=0, limit=100):
+        """Get one page of filtered results"""
+        return self.server.get_results_page(cursor, limit)
+
+    def get_results_since(self, seq):
+        """Get only the filtered results numbered seq onwards"""
+        return self.server.get_results_since(seq)
+
+    def get_cache_stats(self):
+        """Get the server's filter cache counters"""
+        return self.server.get_cache_stats()
\ No newline at end of file
@@ -1,40 +1,49 @@
-from xmlrpc.server import SimpleXMLRPCServer
 from xmlrpc.client import ServerProxy
-import threading
 
-class InsultServiceXMLRPCClient:
-    def __init__(self, host='127.0.0.1', server_port = 8000, cli_port = 8001):
-        self.server = ServerProxy("http://{}:{}".format(host, server_port))
-        self.t = self.listen(cli_port)
-
-    def listen(self, client_port):
-        """Inicia el servidor RPC para recibir insultos"""
-
-        def run_client_server():
-            with SimpleXMLRPCServer(("127.0.0.1", client_port), allow_none=True, logRequests=False) as server_subs:
-                server_subs.register_instance(self)
-                server_subs.timeout = 5
-                while getattr(threading.current_thread(), "do_run", True):
-                    server_subs.handle_request()
+from clients.xmlrpc.batching import MulticallBatcher
+from clients.xmlrpc.notification_receiver import get_receiver
+from clients.xmlrpc.transport import PooledTransport
 
-        t = threading.Thread(target=run_client_server, daemon=True)
-        t.do_run = True
-        t.start()
-
-        callback_url = f"http://127.0.0.1:{client_port}"
+class InsultServiceXMLRPCClient:
+    def __init__(self, host='127.0.0.1', server_port = 8000, cli_port = 0, transport=None):
+        self.server = ServerProxy("http://{}:{}".format(host, server_port),
+                                  transport=transport or PooledTransport(), allow_none=True)
+        self.receiver = get_receiver(cli_port)
+        self.callback_url = self.listen()
+
+    def listen(self):
+        """Se registra en el receptor de notificaciones del proceso y se suscribe con su URL"""
+        callback_url = self.receiver.register(self)
         if self.server.register_subscriber(callback_url):
             print("Successfully registered as subscriber")
         else:
             print("Registration failed")
 
-        return t
+        return callback_url
+
+    def close(self):
+        """Cancela la suscripción y libera la ruta en el receptor"""
+        try:
+            self.server.unregister_subscriber(self.callback_url)
+        finally:
+            self.receiver.unregister(self.callback_url)
 
     def add_insult(self, insult):
         self.server.add_insult(insult)
 
+    def batch(self, max_size=100, max_delay=0.05):
+        """Contexto de agrupación: batch.add_insult(insult) devuelve un Future, se envían por system.multicall"""
+        return MulticallBatcher(self.server, max_size, max_delay)
+
     def get_all_insults(self):
         return self.server.get_all_insults()
 
+    def get_insults_page(self, cursor=0, limit=100):
+        return self.server.get_insults_page(cursor, limit)
+
+    def get_insults_since(self, seq):
+        return self.server.get_insults_since(seq)
+
     def notify(self, insult: str):
         """Método llamado por el servidor para enviar insultos"""
         print(f"Received insult: {insult}")
\ No newline at end of file
@@ -0,0 +1,84 @@
+import os
+import select
+import threading
+import uuid
+from xmlrpc.server import MultiPathXMLRPCServer, SimpleXMLRPCDispatcher, SimpleXMLRPCRequestHandler
+
+
+class AnyPathRequestHandler(SimpleXMLRPCRequestHandler):
+    """Atiende cualquier ruta y mantiene la conexión del servicio entre notificaciones
+
+    Con HTTP/1.1 el proxy que el servicio guarda por subscriptor reutiliza su
+    conexión. Como el receptor tiene un solo hilo, la cede (cerrándola) en
+    cuanto otra conexión espera en el socket de escucha, o tras timeout
+    segundos inactiva; el cliente XML-RPC reconecta solo en la siguiente.
+    """
+    # Cada cliente tiene su ruta; las desconocidas las responde el servidor con un Fault
+    rpc_paths = ()
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self.wait_next_request():
+            self.handle_one_request()
+
+    def wait_next_request(self):
+        """True si llega otra petición por esta conexión, False si hay que ceder el hilo"""
+        readable, _, _ = select.select([self.connection, self.server.socket], [], [], self.timeout)
+        return self.connection in readable
+
+
+class ReceiverServer(MultiPathXMLRPCServer):
+    # El servicio entrega en paralelo: un backlog de 5 perdería conexiones en cada ronda
+    request_queue_size = 128
+
+
+class NotificationReceiver:
+    """Servidor de callbacks compartido por todos los clientes de un proceso
+
+    Un único MultiPathXMLRPCServer en un solo hilo atiende las notificaciones
+    de todos los clientes: cada uno se registra en su propia ruta
+    (http://127.0.0.1:<port>/<id>), así que el número de hilos y puertos por
+    proceso no crece con los subscriptores y serve_forever espera con select
+    en lugar de sondear con timeouts.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = ReceiverServer((host, port), requestHandler=AnyPathRequestHandler,
+                                     allow_none=True, logRequests=False)
+        self.host = host
+        self.port = self.server.server_address[1]
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def register(self, instance):
+        """Publica los métodos de instance en una ruta nueva, devuelve su URL de callback"""
+        path = f"/{uuid.uuid4().hex}"
+        dispatcher = SimpleXMLRPCDispatcher(allow_none=True)
+        dispatcher.register_instance(instance)
+        with self.lock:
+            self.server.add_dispatcher(path, dispatcher)
+        return f"http://{self.host}:{self.port}{path}"
+
+    def unregister(self, callback_url):
+        path = callback_url[callback_url.index('/', len("http://")):]
+        with self.lock:
+            self.server.dispatchers.pop(path, None)
+
+
+_receiver = None
+_receiver_pid = None
+_receiver_lock = threading.Lock()
+
+def get_receiver(port=0):
+    """Receptor del proceso, creado en el primer uso (en port si se indica, si no en uno libre)"""
+    global _receiver, _receiver_pid
+    with _receiver_lock:
+        if _receiver is None or _receiver_pid != os.getpid():
+            _receiver = NotificationReceiver(port=port)
+            _receiver_pid = os.getpid()
+        return _receiver
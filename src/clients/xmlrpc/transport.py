@@ -0,0 +1,51 @@
+import queue
+import threading
+import xmlrpc.client
+
+from common.xmlrpc_transport import TimeoutTransport
+
+
+class PooledTransport(xmlrpc.client.Transport):
+    """Thread-safe keep-alive transport for ServerProxy
+
+    Each stdlib Transport keeps one persistent HTTP/1.1 connection but can
+    only be used by one thread at a time. This keeps a pool of them, so
+    concurrent calls through the same ServerProxy each take an idle
+    connection (or open one, up to max_connections) instead of paying the
+    TCP setup on every call.
+    """
+
+    def __init__(self, max_connections=8, timeout=None, **kwargs):
+        super().__init__(**kwargs)
+        self.transport_kwargs = kwargs
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_connections)
+
+    def new_transport(self):
+        return TimeoutTransport(self.timeout, **self.transport_kwargs)
+
+    def request(self, host, handler, request_body, verbose=False):
+        self.slots.acquire()
+        try:
+            try:
+                transport = self.idle.get_nowait()
+            except queue.Empty:
+                transport = self.new_transport()
+            try:
+                response = transport.request(host, handler, request_body, verbose)
+            except Exception:
+                # The connection may be half-way through a response, never reuse it
+                transport.close()
+                raise
+            self.idle.put(transport)
+            return response
+        finally:
+            self.slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,99 @@
+import json
+import os
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class JsonCodec:
+    name = 'json'
+    content_type = 'application/json'
+
+    def encode(self, obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    def decode(self, data):
+        return json.loads(data)
+
+    def pack(self, obj):
+        """Encode obj, returns (body, content_type)"""
+        return self.encode(obj), self.content_type
+
+
+class MsgpackCodec(JsonCodec):
+    name = 'msgpack'
+    content_type = 'application/msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("The msgpack codec needs the msgpack package (pip install msgpack)")
+
+    def encode(self, obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def decode(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+class RawCodec(JsonCodec):
+    """Single texts travel as raw UTF-8 bytes, anything structured falls back to JSON
+
+    encode/decode only handle texts; pack() tags structured values as JSON
+    so the receiver decodes them by content type.
+    """
+    name = 'raw'
+    content_type = 'text/plain'
+
+    def encode(self, obj):
+        if not isinstance(obj, str):
+            raise TypeError("The raw codec only encodes single texts, use pack() for structured values")
+        return obj.encode()
+
+    def decode(self, data):
+        return data.decode() if isinstance(data, bytes) else data
+
+    def pack(self, obj):
+        if isinstance(obj, str):
+            return self.encode(obj), self.content_type
+        return JsonCodec.encode(self, obj), JsonCodec.content_type
+
+
+CODECS = {'json': JsonCodec, 'msgpack': MsgpackCodec, 'raw': RawCodec}
+_instances = {}
+
+def get_codec(name=None):
+    """Codec by name, defaulting to the deployment's INSULT_CODEC (json if unset)"""
+    if isinstance(name, JsonCodec):
+        return name
+    name = name or os.environ.get('INSULT_CODEC', 'json')
+    if name not in _instances:
+        if name not in CODECS:
+            raise ValueError(f"Unknown codec {name}, expected one of {', '.join(CODECS)}")
+        _instances[name] = CODECS[name]()
+    return _instances[name]
+
+def structured_codec(name=None):
+    """Codec for payloads that are always structured, like Redis requests
+
+    Those carry no content type, so raw would only ever fall back to JSON:
+    it is mapped to json explicitly.
+    """
+    codec = get_codec(name)
+    return get_codec('json') if codec.name == 'raw' else codec
+
+def codec_for(content_type, default='json'):
+    """Codec matching a message content type, default for messages sent without one"""
+    for name, codec_class in CODECS.items():
+        if codec_class.content_type == content_type:
+            return get_codec(name)
+    return get_codec(default)
+
+def unpack(body, content_type, default='json'):
+    return codec_for(content_type, default).decode(body)
+
+def sniff(data):
+    """Codec of a structured Redis payload: JSON objects start with '{', msgpack maps never do"""
+    first = data[:1]
+    return get_codec('json') if first in (b'{', '{') else get_codec('msgpack')
@@ -0,0 +1,15 @@
+import xmlrpc.client
+
+
+class TimeoutTransport(xmlrpc.client.Transport):
+    """Transport whose connections give up after timeout seconds"""
+
+    def __init__(self, timeout=None, **kwargs):
+        super().__init__(**kwargs)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        if self.timeout is not None:
+            connection.timeout = self.timeout
+        return connection
@@ -1,11 +1,84 @@
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import deque, OrderedDict
+from itertools import islice
+
+from servers.base.insult_matcher import InsultMatcher
+from servers.base.lru_cache import LRUCache
 
 
 class InsultFilterBase(ABC):
     def __init__(self):
         self.results = deque(maxlen=100)
+        self.results_seq = 0
+        self.results_lock = threading.Lock()
+        self.tickets = OrderedDict()
+        self.tickets_maxlen = 10000
+        self.tickets_cond = threading.Condition()
+        self.cache = LRUCache()
+        self.streams = OrderedDict()
+        self.streams_maxlen = 1000
+        self.streams_lock = threading.Lock()
+        self.matcher = None
         self.insults = {"stupid", "idiot", "dumb", "moron", "jerk"}
+        self.insults_version = 0
+        self.sync_lock = threading.Lock()
+
+    @property
+    def insults(self):
+        """Insults currently censored by the filter"""
+        return self._insults
+
+    @insults.setter
+    def insults(self, insults):
+        self._insults = frozenset(insults)
+        self._rebuild_matcher()
+
+    def _add_insults(self, insults):
+        """Add insults to the filter, rebuilding the matcher only if the set changes"""
+        new_insults = self._insults.union(insults)
+        if new_insults != self._insults:
+            self.insults = new_insults
+
+    def _rebuild_matcher(self):
+        """Compile the current insult set; the new matcher replaces the old one atomically"""
+        self.matcher = InsultMatcher(self._insults)
+        # Cached results were censored with the previous insult set
+        self.cache.clear()
+
+    def _apply_insults_since(self, delta):
+        """Apply a get_insults_since style delta {'items', 'next_seq'} from the insult service
+
+        Returns False when the delta starts past our version, i.e. some
+        insults were missed and the caller has to catch up first.
+        """
+        with self.sync_lock:
+            base_seq = delta['next_seq'] - len(delta['items'])
+            if base_seq > self.insults_version:
+                return False
+            new_insults = delta['items'][self.insults_version - base_seq:]
+            if new_insults:
+                self._add_insults(new_insults)
+            self.insults_version = max(self.insults_version, delta['next_seq'])
+            return True
+
+    def start_insult_sync(self, connect, interval=1):
+        """Keep pulling insult deltas from the service; connect() builds its proxy inside the sync thread"""
+        def sync_loop():
+            service = None
+            while True:
+                try:
+                    service = service or connect()
+                    self._apply_insults_since(service.get_insults_since(self.insults_version))
+                except Exception as e:
+                    print(f"Error syncing insults: {e}")
+                    service = None
+                time.sleep(interval)
+
+        sync_thread = threading.Thread(target=sync_loop, daemon=True)
+        sync_thread.start()
 
     @abstractmethod
     def process_queue(self):
@@ -13,7 +86,12 @@ class InsultFilterBase(ABC):
 
     @abstractmethod
     def submit_text(self, text):
-        """Add text to be filtered"""
+        """Add text to be filtered, returns its ticket"""
+        pass
+
+    @abstractmethod
+    def submit_texts(self, texts):
+        """Add a batch of texts to be filtered, returns their tickets"""
         pass
 
     @abstractmethod
@@ -21,7 +99,115 @@ class InsultFilterBase(ABC):
         """Get all filtered results"""
         pass
 
+    def get_results_page(self, cursor=0, limit=100):
+        """Get up to limit results starting at cursor, next_cursor is None on the last page"""
+        with self.results_lock:
+            items = list(islice(self.results, cursor, cursor + limit))
+            more = cursor + limit < len(self.results)
+        return {'items': items, 'next_cursor': cursor + len(items) if more else None}
+
+    def get_results_since(self, seq):
+        """Get the retained results numbered seq onwards and the seq to ask for next"""
+        with self.results_lock:
+            first_seq = self.results_seq - len(self.results)
+            items = list(islice(self.results, max(seq - first_seq, 0), None))
+            return {'items': items, 'next_seq': self.results_seq}
+
+    def _new_ticket(self):
+        """Reserve a ticket for a text that is about to be queued"""
+        ticket = uuid.uuid4().hex
+        with self.tickets_cond:
+            self.tickets[ticket] = None
+            while len(self.tickets) > self.tickets_maxlen:
+                self.tickets.popitem(last=False)
+        return ticket
+
+    def _store_results(self, tickets, filtered_texts):
+        """Publish filtered texts and wake up anyone waiting on their tickets"""
+        self._append_results(filtered_texts)
+        self._resolve_tickets(tickets, filtered_texts)
+
+    def _append_results(self, filtered_texts):
+        """Append to the results window, numbering every result with a sequence"""
+        with self.results_lock:
+            self.results.extend(filtered_texts)
+            self.results_seq += len(filtered_texts)
+
+    def _resolve_tickets(self, tickets, filtered_texts):
+        with self.tickets_cond:
+            for ticket, filtered_text in zip(tickets, filtered_texts):
+                if ticket in self.tickets:
+                    self.tickets[ticket] = filtered_text
+            self.tickets_cond.notify_all()
+
+    def _fail_tickets(self, tickets, error):
+        """Resolve tickets whose batch failed, so their waiters get error instead of hanging"""
+        with self.tickets_cond:
+            for ticket in tickets:
+                if ticket in self.tickets:
+                    self.tickets[ticket] = error
+            self.tickets_cond.notify_all()
+
+    def get_result(self, ticket):
+        """Get the filtered text for a ticket, None while pending or unknown"""
+        with self.tickets_cond:
+            result = self.tickets.get(ticket)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def wait_result(self, ticket, timeout=None):
+        """Block until the ticket is filtered or timeout expires"""
+        with self.tickets_cond:
+            self.tickets_cond.wait_for(
+                lambda: ticket not in self.tickets or self.tickets[ticket] is not None, timeout)
+            result = self.tickets.get(ticket)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
     def filter_text(self, text):
-        for insult in self.insults:
-            text = text.replace(insult, "CENSORED")
-        return text
\ No newline at end of file
+        cache = self.cache
+        if not cache.cacheable(text):
+            return self.matcher.censor(text)
+
+        filtered_text = cache.get(text)
+        if filtered_text is None:
+            generation = cache.generation
+            filtered_text = self.matcher.censor(text)
+            cache.put(text, filtered_text, generation)
+        return filtered_text
+
+    def filter_texts(self, texts):
+        return [self.filter_text(text) for text in texts]
+
+    def open_stream(self):
+        """Start filtering a document sent in chunks, returns its stream id"""
+        stream_id = uuid.uuid4().hex
+        with self.streams_lock:
+            self.streams[stream_id] = self.matcher.stream()
+            while len(self.streams) > self.streams_maxlen:
+                self.streams.popitem(last=False)
+        return stream_id
+
+    def _get_stream(self, stream_id):
+        with self.streams_lock:
+            stream = self.streams.get(stream_id)
+        if stream is None:
+            raise KeyError(f"Unknown stream {stream_id}")
+        return stream
+
+    def feed_stream(self, stream_id, chunk):
+        """Filter the next chunk, returns the censored text that is already final"""
+        return self._get_stream(stream_id).feed(chunk)
+
+    def close_stream(self, stream_id):
+        """Finish a stream, returns the remaining censored text"""
+        tail = self._get_stream(stream_id).close()
+        with self.streams_lock:
+            self.streams.pop(stream_id, None)
+        return tail
+
+    def get_cache_stats(self):
+        """Get hit/miss/eviction counters of the filter_text cache"""
+        return self.cache.stats()
@@ -0,0 +1,151 @@
+from collections import deque
+
+
+class InsultMatcher:
+    """Aho-Corasick automaton that censors every insult in a single pass"""
+
+    def __init__(self, insults, replacement="CENSORED"):
+        self.replacement = replacement
+        self.goto = [{}]
+        self.fail = [0]
+        self.match_len = [0]
+        self.max_len = 0
+
+        for insult in insults:
+            if insult:
+                self._add(insult)
+        self._build_fail_links()
+
+    def _add(self, insult):
+        node = 0
+        for char in insult:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.match_len.append(0)
+            node = nxt
+        self.match_len[node] = max(self.match_len[node], len(insult))
+        self.max_len = max(self.max_len, len(insult))
+
+    def _build_fail_links(self):
+        pending = deque(self.goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self.goto[node].items():
+                pending.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                # Longest insult ending here, either on this path or a suffix of it
+                self.match_len[child] = max(self.match_len[child], self.match_len[self.fail[child]])
+
+    def censor(self, text):
+        """Replace every (possibly overlapping) insult run in text with the replacement"""
+        if not self.max_len or not text:
+            return text
+
+        goto, fail, match_len = self.goto, self.fail, self.match_len
+        runs = []
+        node = 0
+        for pos, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            length = match_len[node]
+            if length:
+                start, end = pos + 1 - length, pos + 1
+                # Merge with previous runs this match overlaps
+                while runs and runs[-1][1] > start:
+                    start = min(start, runs.pop()[0])
+                runs.append((start, end))
+
+        if not runs:
+            return text
+
+        parts = []
+        last = 0
+        for start, end in runs:
+            parts.append(text[last:start])
+            parts.append(self.replacement)
+            last = end
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def stream(self):
+        """Start an incremental censor that accepts the text in chunks"""
+        return CensorStream(self)
+
+
+class CensorStream:
+    """Censors a text fed in chunks, keeping at most max_len chars pending
+
+    Matches that span chunk boundaries are still found because the
+    automaton state and the not-yet-safe tail are carried between feeds.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.node = 0
+        self.pos = 0
+        self.offset = 0
+        self.buffer = ""
+        self.runs = deque()
+
+    def feed(self, chunk):
+        """Consume a chunk and return the censored text that can no longer change"""
+        matcher = self.matcher
+        goto, fail, match_len = matcher.goto, matcher.fail, matcher.match_len
+        runs = self.runs
+        node = self.node
+        pos = self.pos
+        for char in chunk:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            pos += 1
+            length = match_len[node]
+            if length:
+                start = pos - length
+                while runs and runs[-1][1] > start:
+                    start = min(start, runs.pop()[0])
+                runs.append((start, pos))
+        self.node = node
+        self.pos = pos
+        self.buffer += chunk
+        # No future match can start before this point
+        return self.emit(pos - max(matcher.max_len - 1, 0))
+
+    def close(self):
+        """Flush everything still pending at the end of the text"""
+        tail = self.emit(self.pos)
+        self.node = 0
+        return tail
+
+    def emit(self, upto):
+        runs = self.runs
+        buffer, offset = self.buffer, self.offset
+        replacement = self.matcher.replacement
+        parts = []
+        cur = offset
+        while runs and runs[0][1] <= upto:
+            start, end = runs.popleft()
+            if start > cur:
+                parts.append(buffer[cur - offset:start - offset])
+            parts.append(replacement)
+            cur = end
+        if runs and runs[0][0] < upto:
+            # Inside a run that may still grow: its text is going to be censored, drop it
+            start = runs[0][0]
+            if start > cur:
+                parts.append(buffer[cur - offset:start - offset])
+            cur = upto
+        elif upto > cur:
+            parts.append(buffer[cur - offset:upto - offset])
+            cur = upto
+        self.buffer = buffer[cur - offset:]
+        self.offset = cur
+        return "".join(parts)
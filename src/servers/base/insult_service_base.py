@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 
+from servers.base.insult_store import InsultStore
+
 class InsultServiceBase(ABC):
     def __init__(self):
-        self.insults = []
+        self.insults = InsultStore()
         self.broadcaster_active = False
 
     @abstractmethod
@@ -15,6 +17,17 @@ class InsultServiceBase(ABC):
         """Return all stored insults"""
         pass
 
+    def get_insults_page(self, cursor: int = 0, limit: int = 100):
+        """Return up to limit insults starting at cursor, next_cursor is None on the last page"""
+        items = self.insults[cursor:cursor + limit]
+        more = cursor + limit < len(self.insults)
+        return {'items': items, 'next_cursor': cursor + len(items) if more else None}
+
+    def get_insults_since(self, seq: int):
+        """Return insults added after the first seq ones and the seq to ask for next"""
+        items = self.insults[seq:]
+        return {'items': items, 'next_seq': seq + len(items)}
+
     @abstractmethod
     def unregister_subscriber(self, callback_url: str):
         pass
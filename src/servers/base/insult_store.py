@@ -0,0 +1,46 @@
+import random
+import threading
+
+
+class InsultStore:
+    """Append-only insult store with O(1) add, membership and random pick
+
+    Insults keep their insertion order, so an index doubles as a stable
+    pagination cursor / sequence number.
+    """
+
+    def __init__(self, insults=()):
+        self.items = []
+        self.index = set()
+        self.lock = threading.Lock()
+        for insult in insults:
+            self.add(insult)
+
+    def add(self, insult):
+        """Add insult if not already present, returns True when it was new"""
+        with self.lock:
+            if insult in self.index:
+                return False
+            self.index.add(insult)
+            self.items.append(insult)
+            return True
+
+    def random_choice(self):
+        """Uniformly random insult, None when the store is empty"""
+        items = self.items
+        return random.choice(items) if items else None
+
+    def to_list(self):
+        return self.items[:]
+
+    def __contains__(self, insult):
+        return insult in self.index
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items[:])
+
+    def __getitem__(self, key):
+        return self.items[key]
@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU cache with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries=10000, max_key_len=4096):
+        self.max_entries = max_entries
+        self.max_key_len = max_key_len
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cacheable(self, key):
+        return self.max_entries > 0 and len(key) <= self.max_key_len
+
+    def get(self, key):
+        """Return the cached value or None, updating recency and counters"""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation):
+        """Store value unless the cache was cleared since generation was read"""
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self.entries),
+                'capacity': self.max_entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -1,46 +1,165 @@
+import multiprocessing
 import queue
 import threading
+from concurrent.futures import ProcessPoolExecutor
+
 import Pyro4
 from servers.base.insult_filter_base import InsultFilterBase
+from servers.base.insult_matcher import InsultMatcher
+
+worker_matcher = None
+worker_version = None
+worker_insults = None
+
+def init_worker(shared_insults):
+    """Keep the manager namespace the parent publishes the insult set in"""
+    global worker_insults
+    worker_insults = shared_insults
+
+def filter_batch(texts, version):
+    """Filter a batch, first rebuilding this worker's matcher if the insult set changed"""
+    global worker_matcher, worker_version
+    if worker_version != version:
+        worker_version, insults = worker_insults.state
+        worker_matcher = InsultMatcher(insults)
+    return [worker_matcher.censor(text) for text in texts]
 
 @Pyro4.expose
 @Pyro4.behavior(instance_mode="single")
 class InsultFilterPyro(InsultFilterBase):
-    def __init__(self):
+    def __init__(self, workers=1, use_processes=False, max_queue=10000, submit_timeout=5):
+        self.workers = workers
+        self.use_processes = use_processes
+        self.executor = None
+        self.shared_insults = None
+        self.shared_version = 0
         super().__init__()
-        self.work_queue = queue.Queue()
+        if use_processes:
+            # The pool lives as long as the filter; insult changes reach the
+            # workers through the manager namespace instead of a new pool
+            self.manager = multiprocessing.Manager()
+            self.shared_insults = self.manager.Namespace()
+            self._share_insults()
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                                initargs=(self.shared_insults,))
+        self.work_queue = queue.Queue(maxsize=max_queue)
+        self.submit_timeout = submit_timeout
+        self.submit_lock = threading.Lock()
+        self.next_seq = 0
+        self.reorder_lock = threading.Lock()
+        self.reorder = {}
+        self.next_to_store = 0
         self.start_consumer()
 
+    def _rebuild_matcher(self):
+        super()._rebuild_matcher()
+        if self.shared_insults is not None:
+            self._share_insults()
+
+    def _share_insults(self):
+        """Publish the insult set, then its version: workers rebuild on their next batch"""
+        version = self.shared_version + 1
+        self.shared_insults.state = (version, tuple(self.insults))
+        self.shared_version = version
+
     def start_consumer(self):
-        """Start consumer thread to process the queue"""
-        worker = threading.Thread(target=self.process_queue, daemon=True)
-        worker.start()
+        """Start the pool of consumer threads that process the queue"""
+        for _ in range(self.workers):
+            worker = threading.Thread(target=self.process_queue, daemon=True)
+            worker.start()
 
     def process_queue(self):
         """Worker thread function to process incoming texts"""
         while True:
+            seq, tickets, texts = self.work_queue.get(block=True)
+            filtered_texts = []
             try:
-                text = self.work_queue.get(block=True)
-                filtered_text = self.filter_text(text)
-                self.results.append(filtered_text)
-                self.work_queue.task_done()
+                if self.executor:
+                    filtered_texts = self.executor.submit(filter_batch, texts, self.shared_version).result()
+                else:
+                    filtered_texts = self.filter_texts(texts)
+                self._resolve_tickets(tickets, filtered_texts)
             except Exception as e:
                 print(f"Error processing text: {e}")
+                self._fail_tickets(tickets, RuntimeError(f"Error processing text: {e}"))
+            finally:
+                self._store_in_order(seq, filtered_texts)
+                self.work_queue.task_done()
+
+    def _store_in_order(self, seq, filtered_texts):
+        """Append results in submission order even if workers finish out of order"""
+        with self.reorder_lock:
+            self.reorder[seq] = filtered_texts
+            while self.next_to_store in self.reorder:
+                self._append_results(self.reorder.pop(self.next_to_store))
+                self.next_to_store += 1
+
+    def _enqueue(self, tickets, texts):
+        """Queue a batch, blocking up to submit_timeout when the queue is full"""
+        with self.submit_lock:
+            try:
+                self.work_queue.put((self.next_seq, tickets, texts), timeout=self.submit_timeout)
+            except queue.Full:
+                # The caller never gets these tickets, so drop them instead of leaving them pending
+                with self.tickets_cond:
+                    for ticket in tickets:
+                        self.tickets.pop(ticket, None)
+                raise RuntimeError("filter queue full, retry later")
+            self.next_seq += 1
 
     def submit_text(self, text):
         """Add text to be filtered"""
-        self.work_queue.put(text)
+        ticket = self._new_ticket()
+        self._enqueue([ticket], [text])
+        return ticket
+
+    def submit_texts(self, texts):
+        """Add a batch of texts to be filtered"""
+        texts = list(texts)
+        tickets = [self._new_ticket() for _ in texts]
+        self._enqueue(tickets, texts)
+        return tickets
 
     def get_results(self):
         """Get all filtered results"""
-        return list(self.results)
+        with self.results_lock:
+            return list(self.results)
+
+    # Pyro4.expose only tags the methods defined in this class, so the public
+    # InsultFilterBase methods are re-declared here to be callable remotely
+    def get_result(self, ticket):
+        return super().get_result(ticket)
+
+    def wait_result(self, ticket, timeout=None):
+        return super().wait_result(ticket, timeout)
+
+    def get_results_page(self, cursor=0, limit=100):
+        return super().get_results_page(cursor, limit)
+
+    def get_results_since(self, seq):
+        return super().get_results_since(seq)
+
+    def open_stream(self):
+        return super().open_stream()
+
+    def feed_stream(self, stream_id, chunk):
+        return super().feed_stream(stream_id, chunk)
+
+    def close_stream(self, stream_id):
+        return super().close_stream(stream_id)
+
+    def get_cache_stats(self):
+        return super().get_cache_stats()
 
-def run_server(ns="pyro.insult_filter"):
+def run_server(ns="pyro.insult_filter", workers=1, use_processes=False, max_queue=10000, service_ns=None):
     daemon = Pyro4.Daemon()
-    uri = daemon.register(InsultFilterPyro)
+    insult_filter = InsultFilterPyro(workers, use_processes, max_queue)
+    if service_ns:
+        insult_filter.start_insult_sync(lambda: Pyro4.Proxy(Pyro4.locateNS().lookup(service_ns)))
+    uri = daemon.register(insult_filter)
     Pyro4.locateNS().register(ns, uri)
     print("Running InsultFilterPyro server: ", uri)
     daemon.requestLoop()
 
 if __name__ == "__main__":
-    run_server()
\ No newline at end of file
+    run_server()
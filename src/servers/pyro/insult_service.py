@@ -1,4 +1,3 @@
-import random
 import threading
 import time
 
@@ -14,11 +13,18 @@ class InsultServicePyro(InsultServiceBase):
         self.broadcaster_thread = None
 
     def add_insult(self, insult: str):
-        if insult not in self.insults:
-            self.insults.append(insult)
+        return self.insults.add(insult)
 
     def get_all_insults(self):
-        return self.insults
+        return self.insults.to_list()
+
+    # Pyro4.expose only tags the methods defined in this class, so the
+    # InsultServiceBase reads are re-declared here to be callable remotely
+    def get_insults_page(self, cursor: int = 0, limit: int = 100):
+        return super().get_insults_page(cursor, limit)
+
+    def get_insults_since(self, seq: int):
+        return super().get_insults_since(seq)
 
     def register_subscriber(self, subscriber):
         self.subscribers.append(subscriber)
@@ -35,8 +41,8 @@ class InsultServicePyro(InsultServiceBase):
         def broadcaster_loop():
             while True:
                 time.sleep(interval)
-                if self.insults:
-                    insult = random.choice(self.insults)
+                insult = self.insults.random_choice()
+                if insult is not None:
                     self.notify_subscribers(insult)
 
         broadcaster_thread = threading.Thread(target=broadcaster_loop, daemon=True)
@@ -0,0 +1,88 @@
+import math
+import time
+
+import pika
+
+
+class ReplyBatcher:
+    """Agrupa las respuestas y los acks de un canal y adapta su prefetch
+
+    Los handlers encolan su respuesta con reply() y marcan el mensaje con
+    ack(); flush() publica las respuestas pendientes y confirma todo con un
+    único basic_ack(multiple=True), siempre después de publicarlas. consume()
+    hace flush cada vez que process_data_events vacía lo recibido o al
+    llegar a max_batch mensajes.
+
+    El prefetch se ajusta a la media móvil (EWMA) del tiempo de proceso para
+    tener en vuelo unos target_buffer segundos de trabajo: suficiente para no
+    quedarse sin mensajes, sin acaparar los que podrían procesar otras
+    réplicas del escalado dinámico.
+    """
+
+    def __init__(self, channel, prefetch=50, max_batch=100, target_buffer=0.05,
+                 min_prefetch=1, max_prefetch=1000, alpha=0.1):
+        self.channel = channel
+        self.max_batch = max_batch
+        self.target_buffer = target_buffer
+        self.min_prefetch = min_prefetch
+        self.max_prefetch = max_prefetch
+        self.alpha = alpha
+        self.replies = []
+        self.last_tag = None
+        self.unacked = 0
+        self.avg_time = None
+        self.prefetch = prefetch
+        # global_qos: el límite es del canal, así que un basic_qos posterior
+        # afecta también a los consumidores ya registrados
+        self.channel.basic_qos(prefetch_count=prefetch, global_qos=True)
+
+    def timed(self, handler):
+        """Envuelve un on_message_callback para medir su tiempo de proceso"""
+        def callback(ch, method, props, body):
+            start = time.perf_counter()
+            handler(ch, method, props, body)
+            self.record(time.perf_counter() - start)
+        return callback
+
+    def record(self, seconds):
+        if self.avg_time is None:
+            self.avg_time = seconds
+        else:
+            self.avg_time += self.alpha * (seconds - self.avg_time)
+
+    def reply(self, props, body, content_type=None):
+        self.replies.append((props.reply_to, pika.BasicProperties(correlation_id=props.correlation_id,
+                                                                   content_type=content_type), body))
+
+    def ack(self, delivery_tag):
+        self.last_tag = delivery_tag
+        self.unacked += 1
+        if self.unacked >= self.max_batch:
+            self.flush()
+
+    def flush(self):
+        """Publica las respuestas encoladas y confirma los mensajes procesados de una vez"""
+        for routing_key, properties, body in self.replies:
+            self.channel.basic_publish(exchange='', routing_key=routing_key, properties=properties, body=body)
+        self.replies = []
+        if self.last_tag is not None:
+            self.channel.basic_ack(delivery_tag=self.last_tag, multiple=True)
+            self.last_tag = None
+            self.unacked = 0
+        self.adapt_prefetch()
+
+    def adapt_prefetch(self):
+        """Cambia el prefetch solo si el objetivo se aleja más de un 25% del actual"""
+        if not self.avg_time:
+            return
+        target = math.ceil(self.target_buffer / self.avg_time)
+        target = max(self.min_prefetch, min(self.max_prefetch, target))
+        if abs(target - self.prefetch) > self.prefetch * 0.25:
+            self.prefetch = target
+            self.channel.basic_qos(prefetch_count=target, global_qos=True)
+
+    def consume(self, connection, time_limit=1):
+        """Sustituye a start_consuming: procesa eventos y hace flush tras cada ráfaga"""
+        while self.channel.consumer_tags:
+            connection.process_data_events(time_limit=time_limit)
+            self.flush()
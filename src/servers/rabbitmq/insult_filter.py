@@ -1,15 +1,15 @@
 import json
 import signal
 import sys
-from collections import deque
 import pika
+from servers.rabbitmq.batching import ReplyBatcher
+from common.codec import codec_for, unpack
 from servers.base.insult_filter_base import InsultFilterBase
 
 class InsultFilterRabbitMQ(InsultFilterBase):
-    def __init__(self, host, port):
+    def __init__(self, host, port, sync=True):
         super().__init__()
         self.connection = pika.BlockingConnection(pika.ConnectionParameters(host, port))
-        self.filtered_results = deque(maxlen=100)
         self.channel = self.connection.channel()
         self.should_stop = False
 
@@ -18,73 +18,218 @@ class InsultFilterRabbitMQ(InsultFilterBase):
 
         # Colas para operaciones
         self.channel.queue_declare(queue='submit_text_queue')
+        self.channel.queue_declare(queue='submit_texts_queue')
         self.channel.queue_declare(queue='get_results_queue')
+        self.channel.queue_declare(queue='get_result_queue')
+        self.channel.queue_declare(queue='stream_queue')
+        self.channel.queue_declare(queue='results_query_queue')
 
         # Bindings
         self.channel.queue_bind(exchange='insult_filter', queue='submit_text_queue', routing_key='submit_text')
+        self.channel.queue_bind(exchange='insult_filter', queue='submit_texts_queue', routing_key='submit_texts')
         self.channel.queue_bind(exchange='insult_filter', queue='get_results_queue', routing_key='get_results')
+        self.channel.queue_bind(exchange='insult_filter', queue='get_result_queue', routing_key='get_result')
+        self.channel.queue_bind(exchange='insult_filter', queue='stream_queue', routing_key='stream')
+        self.channel.queue_bind(exchange='insult_filter', queue='results_query_queue', routing_key='get_results_page')
+        self.channel.queue_bind(exchange='insult_filter', queue='results_query_queue', routing_key='get_results_since')
+        self.channel.queue_bind(exchange='insult_filter', queue='results_query_queue', routing_key='get_cache_stats')
+
+        # Sincronización de insultos desde InsultService
+        self.changes_consumer_tag = None
+        if sync:
+            self.channel.exchange_declare(exchange='insult_service', exchange_type='direct')
+            self.channel.exchange_declare(exchange='insult_changes', exchange_type='fanout')
+            self.changes_queue = self.channel.queue_declare(queue='', exclusive=True).method.queue
+            self.channel.queue_bind(exchange='insult_changes', queue=self.changes_queue)
+            self.changes_consumer_tag = self.channel.basic_consume(queue=self.changes_queue, auto_ack=True,
+                                                                   on_message_callback=self.handle_insult_changes)
+            self.request_insults_since()
 
         # Configurar consumers
-        self.channel.basic_qos(prefetch_count=50)
-        self.submit_text_consumer_tag = self.channel.basic_consume(queue='submit_text_queue', on_message_callback=self.handle_submit_text)
-        self.get_results_consumer_tag = self.channel.basic_consume(queue='get_results_queue', on_message_callback=self.handle_get_results)
+        self.batcher = ReplyBatcher(self.channel, prefetch=50)
+        self.submit_text_consumer_tag = self.channel.basic_consume(queue='submit_text_queue', on_message_callback=self.batcher.timed(self.handle_submit_text))
+        self.submit_texts_consumer_tag = self.channel.basic_consume(queue='submit_texts_queue', on_message_callback=self.batcher.timed(self.handle_submit_texts))
+        self.get_results_consumer_tag = self.channel.basic_consume(queue='get_results_queue', on_message_callback=self.batcher.timed(self.handle_get_results))
+        self.get_result_consumer_tag = self.channel.basic_consume(queue='get_result_queue', on_message_callback=self.batcher.timed(self.handle_get_result))
+        self.stream_consumer_tag = self.channel.basic_consume(queue='stream_queue', on_message_callback=self.batcher.timed(self.handle_stream))
+        self.results_query_consumer_tag = self.channel.basic_consume(queue='results_query_queue', on_message_callback=self.batcher.timed(self.handle_results_query))
 
     def process_queue(self):
         pass
 
     def submit_text(self, text):
-        filtered = self.filter_text(text)
-        self.filtered_results.append(filtered)
+        return self.submit_texts([text])[0]
+
+    def submit_texts(self, texts, tickets=None):
+        texts = list(texts)
+        tickets = tickets or [self._new_ticket() for _ in texts]
+        self._store_results(tickets, self.filter_texts(texts))
+        return tickets
 
     def get_results(self):
-        return list(self.filtered_results)
+        with self.results_lock:
+            return list(self.results)
+
+    def reply(self, ch, props, response, default='json'):
+        """Responde con el códec del cliente (content_type de la petición), default si no lo indicó"""
+        body, content_type = codec_for(props.content_type, default).pack(response)
+        self.batcher.reply(props, body, content_type)
+
+    def reply_error(self, ch, method, props, error):
+        """Responde el error si la petición lo espera y la confirma: reentregarla fallaría igual"""
+        if props.reply_to:
+            self.reply(ch, props, {'status': 'error', 'message': str(error)})
+        self.batcher.ack(method.delivery_tag)
 
     def handle_submit_text(self, ch, method, props, body):
-        """Add text to be filtered"""
+        """Add text to be filtered
+
+        Without reply_to the submit is one-way: the client chose the ticket
+        (message_id) and the delivery is only acked. With the deliver_result
+        header the reply carries the filtered text along with the ticket, so
+        the client never has to find the replica that holds the result.
+        """
         if self.should_stop:
             ch.basic_reject(delivery_tag=method.delivery_tag, requeue=True)
             return
 
-        text = body.decode()
-        self.submit_text(text)
+        try:
+            text = unpack(body, props.content_type, 'raw')
+        except Exception as e:
+            self.reply_error(ch, method, props, e)
+            return
+        ticket = self.submit_texts([text], [props.message_id] if props.message_id else None)[0]
 
-        ch.basic_publish(
-            exchange='',
-            routing_key=props.reply_to,
-            properties=pika.BasicProperties(correlation_id=props.correlation_id),
-            body="OK"
-        )
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+        if props.reply_to:
+            if props.headers and props.headers.get('deliver_result'):
+                self.reply(ch, props, {'ticket': ticket, 'result': self.get_result(ticket)})
+            else:
+                self.reply(ch, props, ticket, 'raw')
+        self.batcher.ack(method.delivery_tag)
+
+    def handle_submit_texts(self, ch, method, props, body):
+        """Add a JSON-encoded batch of texts to be filtered"""
+        if self.should_stop:
+            ch.basic_reject(delivery_tag=method.delivery_tag, requeue=True)
+            return
+
+        try:
+            tickets = self.submit_texts(unpack(body, props.content_type))
+        except Exception as e:
+            self.reply_error(ch, method, props, e)
+            return
+
+        self.reply(ch, props, tickets)
+        self.batcher.ack(method.delivery_tag)
 
     def handle_get_results(self, ch, method, props, body):
         if self.should_stop:
             ch.basic_reject(delivery_tag=method.delivery_tag, requeue=True)
             return
 
-        response = json.dumps(self.get_results())
+        self.reply(ch, props, self.get_results())
+        self.batcher.ack(method.delivery_tag)
+
+    def handle_get_result(self, ch, method, props, body):
+        """Reply with the filtered text for one ticket (null while unknown)"""
+        if self.should_stop:
+            ch.basic_reject(delivery_tag=method.delivery_tag, requeue=True)
+            return
+
+        try:
+            ticket = unpack(body, props.content_type, 'raw')
+        except Exception as e:
+            self.reply_error(ch, method, props, e)
+            return
+
+        self.reply(ch, props, self.get_result(ticket))
+        self.batcher.ack(method.delivery_tag)
 
-        ch.basic_publish(
-            exchange='',
-            routing_key=props.reply_to,
-            properties=pika.BasicProperties(correlation_id=props.correlation_id),
-            body=response
+    def request_insults_since(self):
+        """Pide al servicio los insultos que faltan; la respuesta llega a la cola de cambios"""
+        self.channel.basic_publish(
+            exchange='insult_service',
+            routing_key='get_insults_since',
+            properties=pika.BasicProperties(reply_to=self.changes_queue),
+            body=json.dumps({'seq': self.insults_version})
         )
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+
+    def handle_insult_changes(self, ch, method, props, body):
+        """Aplica un delta de insultos, pidiendo los que faltan si hay un salto de versión"""
+        try:
+            delta = json.loads(body)
+        except ValueError as e:
+            print(f"Delta de insultos inválido: {e}")
+            return
+        if not self._apply_insults_since(delta):
+            self.request_insults_since()
+
+    def handle_results_query(self, ch, method, props, body):
+        """get_results_page ({'cursor', 'limit'}), get_results_since ({'seq'}) o get_cache_stats según la routing key"""
+        if self.should_stop:
+            ch.basic_reject(delivery_tag=method.delivery_tag, requeue=True)
+            return
+
+        try:
+            params = unpack(body, props.content_type) if body else {}
+        except Exception as e:
+            self.reply_error(ch, method, props, e)
+            return
+        if method.routing_key == 'get_results_since':
+            response = self.get_results_since(params.get('seq', 0))
+        elif method.routing_key == 'get_cache_stats':
+            response = self.get_cache_stats()
+        else:
+            response = self.get_results_page(params.get('cursor', 0), params.get('limit', 100))
+
+        self.reply(ch, props, response)
+        self.batcher.ack(method.delivery_tag)
+
+    def handle_stream(self, ch, method, props, body):
+        """Operaciones de streaming: {'op': open|feed|close, 'stream_id', 'text'}"""
+        if self.should_stop:
+            ch.basic_reject(delivery_tag=method.delivery_tag, requeue=True)
+            return
+
+        try:
+            request = unpack(body, props.content_type)
+            if request['op'] == 'open':
+                response = {'stream_id': self.open_stream()}
+            elif request['op'] == 'feed':
+                response = {'text': self.feed_stream(request['stream_id'], request['text'])}
+            elif request['op'] == 'close':
+                response = {'text': self.close_stream(request['stream_id'])}
+            else:
+                response = {'error': 'Invalid op'}
+        except Exception as e:
+            response = {'error': str(e)}
+
+        self.reply(ch, props, response)
+        self.batcher.ack(method.delivery_tag)
 
     def stop_consuming(self):
         """Detiene el consumo de mensajes de manera controlada."""
         self.should_stop = True
         self.channel.basic_cancel(self.submit_text_consumer_tag)
+        self.channel.basic_cancel(self.submit_texts_consumer_tag)
         self.channel.basic_cancel(self.get_results_consumer_tag)
+        self.channel.basic_cancel(self.get_result_consumer_tag)
+        self.channel.basic_cancel(self.stream_consumer_tag)
+        self.channel.basic_cancel(self.results_query_consumer_tag)
+        if self.changes_consumer_tag:
+            self.channel.basic_cancel(self.changes_consumer_tag)
 
     def close(self):
         """Cierra la conexión con RabbitMQ."""
         self.stop_consuming()
         if self.connection and not self.connection.is_closed:
+            # Publica las respuestas y acks pendientes: si no, los mensajes ya
+            # procesados se reentregarían a otra réplica y se filtrarían dos veces
+            self.batcher.flush()
             self.connection.close()
 
-def run_server(host="127.0.0.1", port=5672):
-    server = InsultFilterRabbitMQ(host, port)
+def run_server(host="127.0.0.1", port=5672, sync=True):
+    server = InsultFilterRabbitMQ(host, port, sync)
     print("Running InsultFilterRabbitMQ server")
 
     # Manejo de señales para apagado controlado
@@ -96,7 +241,7 @@ def run_server(host="127.0.0.1", port=5672):
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
-        server.channel.start_consuming()
+        server.batcher.consume(server.connection)
     except KeyboardInterrupt:
         server.close()
     except Exception as e:
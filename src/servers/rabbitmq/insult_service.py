@@ -1,9 +1,10 @@
 import json
-import random
 import threading
 import time
 import pika
 
+from common.codec import codec_for, unpack
+from servers.rabbitmq.batching import ReplyBatcher
 from servers.base.insult_service_base import InsultServiceBase
 
 class InsultServiceRabbitMQ(InsultServiceBase):
@@ -16,31 +17,37 @@ class InsultServiceRabbitMQ(InsultServiceBase):
 
         # Configuración de exchanges y colas
         self.channel.exchange_declare(exchange='insult_service', exchange_type='direct')
+        self.channel.exchange_declare(exchange='insult_changes', exchange_type='fanout')
         self.broadcast_channel.exchange_declare(exchange='insult_broadcast', exchange_type='fanout')
 
         # Colas para diferentes operaciones
         self.channel.queue_declare(queue='add_insult_queue')
         self.channel.queue_declare(queue='get_all_insults_queue')
+        self.channel.queue_declare(queue='insults_query_queue')
 
         # Bindings
         self.channel.queue_bind(exchange='insult_service', queue='add_insult_queue', routing_key='add_insult')
         self.channel.queue_bind(exchange='insult_service', queue='get_all_insults_queue',
                                 routing_key='get_all_insults')
+        self.channel.queue_bind(exchange='insult_service', queue='insults_query_queue',
+                                routing_key='get_insults_page')
+        self.channel.queue_bind(exchange='insult_service', queue='insults_query_queue',
+                                routing_key='get_insults_since')
 
         # Consumers
-        self.channel.basic_qos(prefetch_count=100)
-        self.channel.basic_consume(queue='add_insult_queue', on_message_callback=self.handle_add_insult)
-        self.channel.basic_consume(queue='get_all_insults_queue', on_message_callback=self.handle_get_all_insults)
+        self.batcher = ReplyBatcher(self.channel, prefetch=100)
+        self.channel.basic_consume(queue='add_insult_queue', on_message_callback=self.batcher.timed(self.handle_add_insult))
+        self.channel.basic_consume(queue='get_all_insults_queue', on_message_callback=self.batcher.timed(self.handle_get_all_insults))
+        self.channel.basic_consume(queue='insults_query_queue', on_message_callback=self.batcher.timed(self.handle_insults_query))
 
         self.broadcaster_thread = None
         self.start_broadcaster()
 
     def add_insult(self, insult: str):
-        if insult not in self.insults:
-            self.insults.append(insult)
+        return self.insults.add(insult)
 
     def get_all_insults(self):
-        return self.insults
+        return self.insults.to_list()
 
     def unregister_subscriber(self, subscriber_queue):
         pass
@@ -51,8 +58,8 @@ class InsultServiceRabbitMQ(InsultServiceBase):
         def broadcaster_loop():
             while True:
                 try:
-                    if self.insults:
-                        insult = random.choice(self.insults)
+                    insult = self.insults.random_choice()
+                    if insult is not None:
                         self.notify_subscribers(insult)
                 except Exception as e:
                     print("con lost", e)
@@ -68,32 +75,54 @@ class InsultServiceRabbitMQ(InsultServiceBase):
     def notify_subscribers(self, insult: str):
         self.broadcast_channel.basic_publish(exchange='insult_broadcast', routing_key='', body=insult)
 
-    def handle_add_insult(self, ch, method, props, body):
-        insult = body.decode()
-        self.add_insult(insult)
+    def reply(self, ch, props, response, default='json'):
+        """Responde con el códec del cliente (content_type de la petición), default si no lo indicó"""
+        body, content_type = codec_for(props.content_type, default).pack(response)
+        self.batcher.reply(props, body, content_type)
+
+    def reply_error(self, ch, method, props, error):
+        """Responde el error si la petición lo espera y la confirma: reentregarla fallaría igual"""
+        if props.reply_to:
+            self.reply(ch, props, {'status': 'error', 'message': str(error)})
+        self.batcher.ack(method.delivery_tag)
 
-        ch.basic_publish(
-            exchange='',
-            routing_key=props.reply_to,
-            properties=pika.BasicProperties(correlation_id=props.correlation_id),
-            body="OK"
-        )
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+    def handle_add_insult(self, ch, method, props, body):
+        try:
+            insult = unpack(body, props.content_type, 'raw')
+        except Exception as e:
+            self.reply_error(ch, method, props, e)
+            return
+        if self.add_insult(insult):
+            # Delta con el mismo formato que get_insults_since para los filtros suscritos
+            delta = {'items': [insult], 'next_seq': len(self.insults)}
+            ch.basic_publish(exchange='insult_changes', routing_key='', body=json.dumps(delta))
+
+        self.reply(ch, props, "OK", 'raw')
+        self.batcher.ack(method.delivery_tag)
 
     def handle_get_all_insults(self, ch, method, props, body):
-        response = json.dumps(self.get_all_insults())
-        ch.basic_publish(
-            exchange='',
-            routing_key=props.reply_to,
-            properties=pika.BasicProperties(correlation_id=props.correlation_id),
-            body=response
-        )
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+        self.reply(ch, props, self.get_all_insults())
+        self.batcher.ack(method.delivery_tag)
+
+    def handle_insults_query(self, ch, method, props, body):
+        """get_insults_page ({'cursor', 'limit'}) o get_insults_since ({'seq'}) según la routing key"""
+        try:
+            params = unpack(body, props.content_type) if body else {}
+        except Exception as e:
+            self.reply_error(ch, method, props, e)
+            return
+        if method.routing_key == 'get_insults_since':
+            response = self.get_insults_since(params.get('seq', 0))
+        else:
+            response = self.get_insults_page(params.get('cursor', 0), params.get('limit', 100))
+
+        self.reply(ch, props, response)
+        self.batcher.ack(method.delivery_tag)
 
 def run_server(host="127.0.0.1", port=5672):
     server = InsultServiceRabbitMQ(host, port)
     print("Running InsultServiceRabbitMQ server")
-    server.channel.start_consuming()
+    server.batcher.consume(server.connection)
 
 if __name__ == "__main__":
     run_server()
\ No newline at end of file
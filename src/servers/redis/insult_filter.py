@@ -1,28 +1,83 @@
 import threading
+import time
+import uuid
 import redis
 import json
 from servers.base.insult_filter_base import InsultFilterBase
+from servers.redis.request_loop import serve_requests
 
 class InsultFilterRedis(InsultFilterBase):
-    def __init__(self, host, port):
+    def __init__(self, host, port, results_maxlen=100, results_ttl=None, ticket_ttl=300, sync=True):
         super().__init__()
         self.redis = redis.Redis(host=host, port=port, db=0, decode_responses=True)
         self.work_queue = 'insult_filter:work_queue'
         self.results = 'insult_filter:results'
+        self.results_seq = 'insult_filter:results:seq'
         self.request_queue = 'insult_filter:requests'
+        self.results_maxlen = results_maxlen
+        self.results_ttl = results_ttl
+        self.ticket_prefix = 'insult_filter:result:'
+        self.ticket_ttl = ticket_ttl
+        self.insults_log = 'insult_service:insults:log'
+        self.changes_channel = 'insult_service:changes'
         self.start_consumer()
+        if sync:
+            self.start_insult_sync()
 
     def start_consumer(self):
         """Start consumer thread to process the queue"""
         worker = threading.Thread(target=self.process_queue, daemon=True)
         worker.start()
 
+    def catch_up_insults(self):
+        """Read the insults we missed straight from the service's log"""
+        items = self.redis.lrange(self.insults_log, self.insults_version, -1)
+        self._apply_insults_since({'items': items, 'next_seq': self.insults_version + len(items)})
+
+    @staticmethod
+    def merge_deltas(first, second):
+        """Join two consecutive deltas, None if they are not contiguous"""
+        if second['next_seq'] - len(second['items']) != first['next_seq']:
+            return None
+        return {'items': first['items'] + second['items'], 'next_seq': second['next_seq']}
+
+    def start_insult_sync(self, connect=None, interval=1):
+        """Follow the insult service's change channel, catching up from its log on gaps"""
+        def sync_loop():
+            while True:
+                try:
+                    pubsub = self.redis.pubsub()
+                    # Subscribe before catching up so no delta falls in between
+                    pubsub.subscribe(self.changes_channel)
+                    self.catch_up_insults()
+                    for message in pubsub.listen():
+                        if message['type'] != 'message':
+                            continue
+                        # Coalesce a burst of deltas so the matcher is rebuilt once
+                        delta = json.loads(message['data'])
+                        while delta is not None and (message := pubsub.get_message(timeout=0)) is not None:
+                            if message['type'] == 'message':
+                                delta = self.merge_deltas(delta, json.loads(message['data']))
+                        if delta is None or not self._apply_insults_since(delta):
+                            self.catch_up_insults()
+                except Exception as e:
+                    print(f"Error syncing insults: {e}")
+                    time.sleep(interval)
+
+        sync_thread = threading.Thread(target=sync_loop, daemon=True)
+        sync_thread.start()
+
     def process_request(self, request_data):
         """Process a client request"""
         if request_data['action'] == 'submit_text':
             try:
-                self.submit_text(request_data['text'])
-                return {'status': 'success'}
+                return {'status': 'success', 'ticket': self.submit_text(request_data['text'])}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+
+        elif request_data['action'] == 'submit_texts':
+            try:
+                return {'status': 'success', 'tickets': self.submit_texts(request_data['texts'])}
             except Exception as e:
                 return {'status': 'error', 'message': str(e)}
 
@@ -31,6 +86,44 @@ class InsultFilterRedis(InsultFilterBase):
                 return {'status': 'success', 'results': self.get_results()}
             except Exception as e:
                 return {'status': 'error', 'message': str(e)}
+
+        elif request_data['action'] == 'open_stream':
+            try:
+                return {'status': 'success', 'stream_id': self.open_stream()}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+
+        elif request_data['action'] == 'feed_stream':
+            try:
+                return {'status': 'success',
+                        'text': self.feed_stream(request_data['stream_id'], request_data['text'])}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+
+        elif request_data['action'] == 'close_stream':
+            try:
+                return {'status': 'success', 'text': self.close_stream(request_data['stream_id'])}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+
+        elif request_data['action'] == 'get_results_page':
+            try:
+                return {'status': 'success', 'results': self.get_results_page(request_data.get('cursor', 0),
+                                                                              request_data.get('limit', 100))}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+
+        elif request_data['action'] == 'get_results_since':
+            try:
+                return {'status': 'success', 'results': self.get_results_since(request_data['seq'])}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+
+        elif request_data['action'] == 'get_cache_stats':
+            try:
+                return {'status': 'success', 'results': self.get_cache_stats()}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
         else:
             return {'status': 'error', 'message': 'Invalid action'}
 
@@ -38,37 +131,72 @@ class InsultFilterRedis(InsultFilterBase):
         """Worker thread function to process incoming texts"""
         while True:
             try:
-                _, text = self.redis.blpop([self.work_queue], timeout=0)
-                filtered_text = self.filter_text(text)
-                self.redis.rpush(self.results, filtered_text)
+                _, work_json = self.redis.blpop([self.work_queue], timeout=0)
+                work = json.loads(work_json)
+                filtered_texts = self.filter_texts(work['texts'])
+                if filtered_texts:
+                    self._store_results(work['tickets'], filtered_texts)
             except Exception as e:
                 print(f"Error processing text: {e}")
 
+    def _new_ticket(self):
+        return uuid.uuid4().hex
+
     def submit_text(self, text):
-        self.redis.rpush(self.work_queue, json.dumps(text))
+        return self.submit_texts([text])[0]
+
+    def submit_texts(self, texts):
+        """Queue a whole batch as a single work item"""
+        texts = list(texts)
+        tickets = [self._new_ticket() for _ in texts]
+        self.redis.rpush(self.work_queue, json.dumps({'tickets': tickets, 'texts': texts}))
+        return tickets
+
+    def _store_results(self, tickets, filtered_texts):
+        """Push results and trim the list atomically so it never outgrows results_maxlen"""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(self.results, *filtered_texts)
+        pipe.ltrim(self.results, -self.results_maxlen, -1)
+        pipe.incrby(self.results_seq, len(filtered_texts))
+        if self.results_ttl:
+            pipe.expire(self.results, self.results_ttl)
+        for ticket, filtered_text in zip(tickets, filtered_texts):
+            # One-element list per ticket so waiters can block on it with BLMOVE
+            pipe.rpush(self.ticket_prefix + ticket, filtered_text)
+            pipe.expire(self.ticket_prefix + ticket, self.ticket_ttl)
+        pipe.execute()
+
+    def get_result(self, ticket):
+        return self.redis.lindex(self.ticket_prefix + ticket, 0)
+
+    def wait_result(self, ticket, timeout=None):
+        key = self.ticket_prefix + ticket
+        # Rotating the list onto itself blocks until it exists without consuming it
+        return self.redis.blmove(key, key, timeout or 0, 'LEFT', 'LEFT')
 
     def get_results(self):
-        return self.redis.lrange(self.results, -100, -1)
+        return self.redis.lrange(self.results, -self.results_maxlen, -1)
 
+    def get_results_page(self, cursor=0, limit=100):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrange(self.results, cursor, cursor + limit - 1)
+        pipe.llen(self.results)
+        items, length = pipe.execute()
+        return {'items': items, 'next_cursor': cursor + len(items) if cursor + limit < length else None}
 
-def run_server(host="127.0.0.1", port=6379):
-    service = InsultFilterRedis(host, port)
+    def get_results_since(self, seq):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(self.results_seq)
+        pipe.lrange(self.results, 0, -1)
+        next_seq, items = pipe.execute()
+        next_seq = int(next_seq or 0)
+        first_seq = next_seq - len(items)
+        return {'items': items[max(seq - first_seq, 0):], 'next_seq': next_seq}
 
-    while True:
-        try:
-            request = None
-            try:
-                _, request_json = service.redis.blpop([service.request_queue], timeout=0)
-                request = json.loads(request_json)
-                response = service.process_request(request)
-                if 'response_channel' in request:
-                    service.redis.publish(request['response_channel'], json.dumps(response))
-            except Exception as e:
-                error_response = {'status': 'error', 'message': str(e)}
-                if 'response_channel' in request:
-                    service.redis.publish(request['response_channel'], json.dumps(error_response))
-        except Exception as e:
-            print(f"Error procesando petición: {e}")
+
+def run_server(host="127.0.0.1", port=6379, results_maxlen=100, results_ttl=None, ticket_ttl=300, sync=True, batch_size=100, workers=1):
+    service = InsultFilterRedis(host, port, results_maxlen, results_ttl, ticket_ttl, sync)
+    serve_requests(service, batch_size, workers)
 
 if __name__ == "__main__":
     run_server()
\ No newline at end of file
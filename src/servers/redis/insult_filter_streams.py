@@ -0,0 +1,118 @@
+import os
+import socket
+import threading
+import time
+
+import redis
+from servers.redis.insult_filter import InsultFilterRedis
+from servers.redis.request_loop import decode_request, queue_reply, wire_connection
+
+class InsultFilterRedisStreams(InsultFilterRedis):
+    """InsultFilterRedis fed from a Redis Stream through a consumer group
+
+    Requests stay in the group's pending list until the reply and the
+    filtered results are written, so a worker dying mid-request only delays
+    it: entries idle for longer than min_idle_ms are reclaimed by the
+    surviving consumers (at-least-once delivery).
+    """
+
+    def __init__(self, host, port, consumer=None, workers=1, batch_size=100, block_ms=1000,
+                 min_idle_ms=30000, **kwargs):
+        self.stream = 'insult_filter:stream'
+        self.group = 'insult_filter:workers'
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.workers = workers
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.min_idle_ms = min_idle_ms
+        super().__init__(host, port, **kwargs)
+
+    def start_consumer(self):
+        """Create the consumer group if needed and start the stream workers"""
+        self.wire = wire_connection(self)
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        for i in range(self.workers):
+            worker = threading.Thread(target=self.process_queue, args=(f"{self.consumer}-{i}",), daemon=True)
+            worker.start()
+
+    def process_queue(self, consumer=None):
+        """Worker: reclaim stale pending entries, then read new ones in batches"""
+        last_reclaim = 0
+        while True:
+            try:
+                if time.time() - last_reclaim > self.min_idle_ms / 1000:
+                    last_reclaim = time.time()
+                    # Reply is [next id, entries] (+ [deleted ids] on Redis 7)
+                    entries = self.wire.xautoclaim(self.stream, self.group, consumer, self.min_idle_ms,
+                                                    start_id='0-0', count=self.batch_size)[1]
+                    if entries:
+                        self.handle_entries(entries)
+
+                streams = self.wire.xreadgroup(self.group, consumer, {self.stream: '>'},
+                                                count=self.batch_size, block=self.block_ms)
+                for _, entries in streams or []:
+                    self.handle_entries(entries)
+            except Exception as e:
+                print(f"Error processing stream: {e}")
+                time.sleep(1)
+
+    def handle_entries(self, entries):
+        """Process a batch of entries, then send their replies and XACK them in one round trip"""
+        pipe = self.wire.pipeline(transaction=False)
+        entry_ids = []
+        for entry_id, fields in entries:
+            entry_ids.append(entry_id)
+            if not fields:
+                # Trimmed away by MAXLEN before it was processed
+                continue
+            request, codec = None, None
+            try:
+                request, codec = decode_request(fields[b'data'])
+                response = self.process_request(request)
+            except Exception as e:
+                response = {'status': 'error', 'message': str(e)}
+            queue_reply(pipe, request, response, codec)
+        pipe.xack(self.stream, self.group, *entry_ids)
+        pipe.execute()
+
+    def submit_texts(self, texts):
+        """Filter right away so results are stored before the entry is acknowledged"""
+        texts = list(texts)
+        tickets = [self._new_ticket() for _ in texts]
+        self._store_results(tickets, self.filter_texts(texts))
+        return tickets
+
+    def process_request(self, request_data):
+        if request_data['action'] == 'get_consumer_lag':
+            try:
+                return {'status': 'success', 'results': self.get_consumer_lag()}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+        return super().process_request(request_data)
+
+    def get_consumer_lag(self):
+        """Entries not yet delivered to the group (lag) and delivered but not acked (pending)"""
+        for group in self.redis.xinfo_groups(self.stream):
+            if group['name'] == self.group:
+                return {'lag': group.get('lag'), 'pending': group['pending'], 'consumers': group['consumers'],
+                        'length': self.redis.xlen(self.stream)}
+        return None
+
+
+def run_server(host="127.0.0.1", port=6379, workers=1, batch_size=100, min_idle_ms=30000, report_interval=10):
+    service = InsultFilterRedisStreams(host, port, workers=workers, batch_size=batch_size, min_idle_ms=min_idle_ms)
+    print(f"Running InsultFilterRedisStreams consumer {service.consumer}")
+
+    while True:
+        time.sleep(report_interval)
+        try:
+            print(f"Consumer lag: {service.get_consumer_lag()}")
+        except Exception as e:
+            print(f"Error reading consumer lag: {e}")
+
+if __name__ == "__main__":
+    run_server()
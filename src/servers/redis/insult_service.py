@@ -1,14 +1,45 @@
-import json
-
 import redis
 from threading import Thread, Event
 from servers.base.insult_service_base import InsultServiceBase
+from servers.redis.request_loop import serve_requests
 
 class InsultServiceRedis(InsultServiceBase):
     def __init__(self, host, port):
         super().__init__()
         self.redis = redis.Redis(host=host, port=port, db=0, decode_responses=True)
         self.insults = 'insult_service:insults'
+        self.insults_log = 'insult_service:insults:log'
+        self.changes_channel = 'insult_service:changes'
+        # The set deduplicates, the log keeps insertion order for pagination and
+        # every new insult is published as a get_insults_since style delta. The
+        # log length is the insults version: only a new insult bumps it
+        self.add_insult_script = self.redis.register_script("""
+            if redis.call('SADD', KEYS[1], ARGV[1]) == 1 then
+                local version = redis.call('RPUSH', KEYS[2], ARGV[1])
+                redis.call('PUBLISH', ARGV[2], cjson.encode({items = {ARGV[1]}, next_seq = version}))
+                return version
+            end
+            return 0
+        """)
+        # Insults stored before the log existed are only in the set: append them
+        # once, so the log (and with it the version) covers every insult
+        self.redis.register_script("""
+            if redis.call('SCARD', KEYS[1]) == redis.call('LLEN', KEYS[2]) then
+                return 0
+            end
+            local logged = {}
+            for _, insult in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+                logged[insult] = true
+            end
+            local added = 0
+            for _, insult in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+                if not logged[insult] then
+                    redis.call('RPUSH', KEYS[2], insult)
+                    added = added + 1
+                end
+            end
+            return added
+        """)(keys=[self.insults, self.insults_log])
         self.request_queue = 'insult_service:requests'
         self.notify_channel = "insult_service:notify"
 
@@ -28,9 +59,20 @@ class InsultServiceRedis(InsultServiceBase):
                 return {'status': 'success', 'results': self.get_all_insults()}
             except Exception as e:
                 return {'status': 'error', 'message': str(e)}
-        elif request_data['action'] == 'get_all_insults':
+        elif request_data['action'] == 'get_insults_version':
             try:
-                return {'status': 'success', 'results': self.get_all_insults()}
+                return {'status': 'success', 'version': self.get_insults_version()}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+        elif request_data['action'] == 'get_insults_page':
+            try:
+                return {'status': 'success', 'results': self.get_insults_page(request_data.get('cursor', 0),
+                                                                              request_data.get('limit', 100))}
+            except Exception as e:
+                return {'status': 'error', 'message': str(e)}
+        elif request_data['action'] == 'get_insults_since':
+            try:
+                return {'status': 'success', 'results': self.get_insults_since(request_data['seq'])}
             except Exception as e:
                 return {'status': 'error', 'message': str(e)}
         else:
@@ -38,11 +80,26 @@ class InsultServiceRedis(InsultServiceBase):
 
     def add_insult(self, insult: str):
         """Add insult if not already present"""
-        self.redis.sadd(self.insults, insult)
+        self.add_insult_script(keys=[self.insults, self.insults_log], args=[insult, self.changes_channel])
 
     def get_all_insults(self):
-        """Return all stored insults"""
-        return list(self.redis.smembers(self.insults))
+        """Return all stored insults in insertion order, the same view clients cache from the log"""
+        return self.redis.lrange(self.insults_log, 0, -1)
+
+    def get_insults_version(self):
+        """Monotonic version of the insult list, bumped by every new insult"""
+        return self.redis.llen(self.insults_log)
+
+    def get_insults_page(self, cursor: int = 0, limit: int = 100):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrange(self.insults_log, cursor, cursor + limit - 1)
+        pipe.llen(self.insults_log)
+        items, length = pipe.execute()
+        return {'items': items, 'next_cursor': cursor + len(items) if cursor + limit < length else None}
+
+    def get_insults_since(self, seq: int):
+        items = self.redis.lrange(self.insults_log, seq, -1)
+        return {'items': items, 'next_seq': seq + len(items)}
 
     def unregister_subscriber(self, callback_url: str):
         pass
@@ -70,24 +127,9 @@ class InsultServiceRedis(InsultServiceBase):
     def notify_subscribers(self, insult: str):
         self.redis.publish(self.notify_channel, insult)
 
-def run_server(host="127.0.0.1", port=6379):
+def run_server(host="127.0.0.1", port=6379, batch_size=100, workers=1):
     service = InsultServiceRedis(host, port)
-
-    while True:
-        try:
-            request = None
-            try:
-                _, request_json = service.redis.blpop([service.request_queue], timeout=0)
-                request = json.loads(request_json)
-                response = service.process_request(request)
-                if 'response_channel' in request:
-                    service.redis.publish(request['response_channel'], json.dumps(response))
-            except Exception as e:
-                error_response = {'status': 'error', 'message': str(e)}
-                if 'response_channel' in request:
-                   service.redis.publish(request['response_channel'], json.dumps(error_response))
-        except Exception as e:
-            print(f"Error procesando petición: {e}")
+    serve_requests(service, batch_size, workers)
 
 if __name__ == "__main__":
     run_server()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import threading
+
+import redis
+from common.codec import get_codec, sniff
+
+REPLY_TTL = 60
+
+def wire_connection(service):
+    """Connection without decode_responses for the request/reply payloads
+
+    Requests may be JSON or msgpack, so they are read as bytes and decoded
+    once by their codec instead of paying a UTF-8 decode first.
+    """
+    pool = service.redis.connection_pool
+    return redis.Redis(connection_pool=redis.ConnectionPool(connection_class=pool.connection_class,
+                                                           **{**pool.connection_kwargs, 'decode_responses': False}))
+
+def decode_request(request_data):
+    """Returns (request, codec) so the reply goes back in the codec the client chose"""
+    codec = sniff(request_data)
+    return codec.decode(request_data), codec
+
+def queue_reply(pipe, request, response, codec=None):
+    """Queue the response for the client that sent request on a pipeline
+
+    Clients with a persistent reply list get it pushed there, tagged with the
+    correlation id; the list expires if the client goes away. Older clients
+    still get it published on their one-off response channel.
+    """
+    if request is None:
+        return
+    codec = codec or get_codec('json')
+    if 'reply_to' in request:
+        pipe.rpush(request['reply_to'], codec.encode({'correlation_id': request['correlation_id'],
+                                                      'response': response}))
+        pipe.expire(request['reply_to'], REPLY_TTL)
+    elif 'response_channel' in request:
+        pipe.publish(request['response_channel'], codec.encode(response))
+
+def drain_requests(redis_conn, request_queue, batch_size):
+    """Block for one request, then grab whatever else is queued up to batch_size"""
+    _, request_data = redis_conn.blpop([request_queue], timeout=0)
+    requests = [request_data]
+    if batch_size > 1:
+        requests.extend(redis_conn.lpop(request_queue, batch_size - 1) or [])
+    return requests
+
+def handle_requests(service, wire, batch_size):
+    """One wakeup: process a drained batch and pipeline every reply in one round trip"""
+    pipe = wire.pipeline(transaction=False)
+    for request_data in drain_requests(wire, service.request_queue, batch_size):
+        request, codec = None, None
+        try:
+            request, codec = decode_request(request_data)
+            response = service.process_request(request)
+        except Exception as e:
+            response = {'status': 'error', 'message': str(e)}
+        queue_reply(pipe, request, response, codec)
+    pipe.execute()
+
+def serve_requests(service, batch_size=100, workers=1):
+    """Run the request loop on workers threads sharing service's connection pool
+
+    Every worker pops from the same Redis list, so the loop can also be run
+    from several processes against one request queue.
+    """
+    wire = wire_connection(service)
+
+    def worker_loop():
+        while True:
+            try:
+                handle_requests(service, wire, batch_size)
+            except Exception as e:
+                print(f"Error procesando petición: {e}")
+
+    threads = [threading.Thread(target=worker_loop, daemon=True) for _ in range(workers - 1)]
+    for thread in threads:
+        thread.start()
+    worker_loop()
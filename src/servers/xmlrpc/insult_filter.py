@@ -1,10 +1,8 @@
 import queue
-from xmlrpc.server import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+from xmlrpc.client import ServerProxy
 import threading
 from servers.base.insult_filter_base import InsultFilterBase
-
-class RequestHandler(SimpleXMLRPCRequestHandler):
-    rpc_paths = ('/RPC2',)
+from servers.xmlrpc.pooled_server import create_server
 
 class InsultFilterXMLRPCServer(InsultFilterBase):
     def __init__(self):
@@ -21,25 +19,37 @@ class InsultFilterXMLRPCServer(InsultFilterBase):
         """Worker thread function to process incoming texts"""
         while True:
             try:
-                text = self.work_queue.get(block=True)
-                filtered_text = self.filter_text(text)
-                self.results.append(filtered_text)
+                tickets, texts = self.work_queue.get(block=True)
+                self._store_results(tickets, self.filter_texts(texts))
                 self.work_queue.task_done()
             except Exception as e:
                 print(f"Error processing text: {e}")
 
     def submit_text(self, text):
         """Add text to the processing queue"""
-        self.work_queue.put(text)
+        ticket = self._new_ticket()
+        self.work_queue.put(([ticket], [text]))
+        return ticket
+
+    def submit_texts(self, texts):
+        """Add a batch of texts to the processing queue"""
+        texts = list(texts)
+        tickets = [self._new_ticket() for _ in texts]
+        self.work_queue.put((tickets, texts))
+        return tickets
 
     def get_results(self):
         """Retrieve filtered results"""
-        return list(self.results)
+        with self.results_lock:
+            return list(self.results)
 
 
-def run_server(host='127.0.0.1', port=8000):
-    server = SimpleXMLRPCServer((host, port), requestHandler=RequestHandler, allow_none=True, logRequests=False)
-    server.register_instance(InsultFilterXMLRPCServer())
+def run_server(host='127.0.0.1', port=8000, service_url=None, workers=0, max_connections=64):
+    server = create_server(host, port, workers, max_connections)
+    insult_filter = InsultFilterXMLRPCServer()
+    if service_url:
+        insult_filter.start_insult_sync(lambda: ServerProxy(service_url))
+    server.register_instance(insult_filter)
     print(f"InsultFilterXMLRPCServer running on {host}:{port}")
     server.serve_forever()
 
@@ -1,55 +1,83 @@
-from xmlrpc.server import SimpleXMLRPCServer
-from threading import Thread, Event
-import random
-from typing import List
+import queue
+from threading import Thread, Event, Lock
+from typing import Dict, List, Set
 from xmlrpc.client import ServerProxy
+from common.xmlrpc_transport import TimeoutTransport
 from servers.base.insult_service_base import InsultServiceBase
-from servers.xmlrpc.insult_filter import RequestHandler
+from servers.xmlrpc.pooled_server import create_server
 
 class InsultServiceXMLRPC(InsultServiceBase):
-    def __init__(self):
+    def __init__(self, notify_workers: int = 32, notify_timeout: float = 2, max_failures: int = 3):
         super().__init__()
-        self.insults: List[str] = []
         self.subscribers: List[str] = []
+        # Con el servidor concurrente varios hilos registran y notifican a la vez
+        self.subscribers_lock = Lock()
+        # Difusión en paralelo: un proxy persistente por subscriptor, cada entrega con
+        # notify_timeout segundos y expulsión tras max_failures fallos seguidos
+        self.notify_queue = queue.Queue()
+        self.notify_workers = notify_workers
+        self.notify_threads: List[Thread] = []
+        self.notify_timeout = notify_timeout
+        self.max_failures = max_failures
+        self.subscriber_proxies: Dict[str, ServerProxy] = {}
+        self.subscriber_failures: Dict[str, int] = {}
+        self.notify_in_flight: Set[str] = set()
         self.broadcaster_thread = None
+        self.broadcaster_lock = Lock()
         self.stop_event = Event()
 
     # Métodos básicos RPC
     def add_insult(self, insult: str) -> bool:
         """Añade un insulto a la lista si no existe"""
-        if insult not in self.insults:
-            self.insults.append(insult)
-            return True
-        return False
+        return self.insults.add(insult)
 
     def get_all_insults(self) -> List[str]:
         """Devuelve todos los insultos almacenados"""
-        return self.insults.copy()
+        return self.insults.to_list()
 
     # Sistema de broadcasting
     def register_subscriber(self, callback_url: str) -> bool:
         """Registra un cliente para recibir insultos aleatorios"""
-        if callback_url not in self.subscribers:
+        with self.subscribers_lock:
+            if callback_url in self.subscribers:
+                return False
             self.subscribers.append(callback_url)
 
-            # Inicia el broadcaster si es el primer subscriptor
-            if len(self.subscribers) == 1:
-                self.start_broadcaster()
-
-            return True
-        return False
+        self._update_broadcaster()
+        return True
 
     def unregister_subscriber(self, callback_url: str) -> bool:
         """Elimina un cliente de la lista de subscriptores"""
-        if callback_url in self.subscribers:
+        with self.subscribers_lock:
+            if callback_url not in self.subscribers:
+                return False
             self.subscribers.remove(callback_url)
-
-            # Detiene el broadcaster si no hay subscriptores
-            if not self.subscribers and self.broadcaster_thread:
+            self.subscriber_proxies.pop(callback_url, None)
+            self.subscriber_failures.pop(callback_url, None)
+
+        self._update_broadcaster()
+        return True
+
+    def _update_broadcaster(self):
+        """Inicia el broadcaster con el primer subscriptor y lo detiene cuando no queda ninguno"""
+        with self.broadcaster_lock:
+            with self.subscribers_lock:
+                active = bool(self.subscribers)
+            running = self.broadcaster_thread is not None and not self.stop_event.is_set()
+            if active and not running:
+                self._start_notify_workers()
+                self.start_broadcaster()
+            elif not active and running:
                 self.stop_broadcaster()
 
-            return True
-        return False
+    def _start_notify_workers(self):
+        """Crea el pool de difusión la primera vez que hay a quién notificar; después se reutiliza"""
+        # Hilos daemon, como en el servidor con pool: entregas pendientes a
+        # subscriptores caídos no deben retrasar la salida del proceso
+        while len(self.notify_threads) < self.notify_workers:
+            thread = Thread(target=self._notify_worker, daemon=True)
+            thread.start()
+            self.notify_threads.append(thread)
 
     def start_broadcaster(self, interval: int = 5) -> None:
         """Inicia el hilo que envía insultos cada 5 segundos"""
@@ -57,8 +85,8 @@ class InsultServiceXMLRPC(InsultServiceBase):
 
         def broadcaster_loop():
             while not self.stop_event.wait(interval):
-                if self.insults:
-                    insult = random.choice(self.insults)
+                insult = self.insults.random_choice()
+                if insult is not None:
                     self.notify_subscribers(insult)
 
         self.broadcaster_thread = Thread(target=broadcaster_loop, daemon=True)
@@ -71,18 +99,60 @@ class InsultServiceXMLRPC(InsultServiceBase):
             self.broadcaster_thread.join()
 
     def notify_subscribers(self, insult: str):
-        """Notifica a todos los clientes registrados"""
-        for subscriber_url in self.subscribers[:]:
-            try:
-                proxy = ServerProxy(subscriber_url)
-                proxy.notify(insult)
-            except Exception as e:
-                print(f"Error notifying {subscriber_url}: {e}")
+        """Notifica a todos los clientes registrados sin esperar a ninguno
+
+        Un subscriptor que aún no ha recibido el insulto anterior se salta en
+        esta ronda, así uno lento nunca acumula entregas ni ocupa más de un hilo.
+        """
+        with self.subscribers_lock:
+            subscribers = [url for url in self.subscribers if url not in self.notify_in_flight]
+            self.notify_in_flight.update(subscribers)
+        for subscriber_url in subscribers:
+            self.notify_queue.put((subscriber_url, insult))
+
+    def _notify_worker(self):
+        """Hilo del pool de difusión: entrega los insultos encolados uno a uno"""
+        while True:
+            self._notify_subscriber(*self.notify_queue.get())
+
+    def _subscriber_proxy(self, subscriber_url: str) -> ServerProxy:
+        with self.subscribers_lock:
+            proxy = self.subscriber_proxies.get(subscriber_url)
+            if proxy is None:
+                proxy = ServerProxy(subscriber_url, transport=TimeoutTransport(self.notify_timeout), allow_none=True)
+                self.subscriber_proxies[subscriber_url] = proxy
+            return proxy
+
+    def _notify_subscriber(self, subscriber_url: str, insult: str):
+        """Entrega un insulto a un subscriptor, expulsándolo si acumula demasiados fallos"""
+        try:
+            self._subscriber_proxy(subscriber_url).notify(insult)
+            error = None
+        except Exception as e:
+            error = e
+
+        with self.subscribers_lock:
+            self.notify_in_flight.discard(subscriber_url)
+            if error is None:
+                self.subscriber_failures.pop(subscriber_url, None)
+                return
+            # La conexión puede haber quedado a medias: el siguiente intento abre otra
+            self.subscriber_proxies.pop(subscriber_url, None)
+            failures = self.subscriber_failures.get(subscriber_url, 0) + 1
+            self.subscriber_failures[subscriber_url] = failures
+            evicted = failures >= self.max_failures and subscriber_url in self.subscribers
+            if evicted:
                 self.subscribers.remove(subscriber_url)
+                self.subscriber_failures.pop(subscriber_url, None)
+                print(f"Error notifying {subscriber_url}: {error}, removed after {failures} failures")
+
+        # Si era el último subscriptor, el broadcaster ya no tiene a quién notificar
+        if evicted:
+            self._update_broadcaster()
 
 
-def run_server(host: str = "127.0.0.1", port: int = 8000):
-    server = SimpleXMLRPCServer((host, port), requestHandler=RequestHandler, allow_none=True, logRequests=False)
+def run_server(host: str = "127.0.0.1", port: int = 8000, workers: int = 0, max_connections: int = 64):
+    server = create_server(host, port, workers, max_connections)
     service = InsultServiceXMLRPC()
     server.register_instance(service)
     print(f"InsultServiceXMLRPC running on {host}:{port}")
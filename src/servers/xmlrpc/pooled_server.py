@@ -0,0 +1,105 @@
+import queue
+import select
+import threading
+import time
+from xmlrpc.server import SimpleXMLRPCServer, SimpleXMLRPCRequestHandler
+
+class RequestHandler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ('/RPC2',)
+
+class KeepAliveRequestHandler(RequestHandler):
+    """Anuncia HTTP/1.1 para que los clientes reutilicen la conexión entre llamadas
+
+    Solo se usa con el pool de hilos. Una conexión persistente ocupa su hilo
+    mientras espera la siguiente petición, así que la cede (cerrándola) en
+    cuanto otra conexión espera hilo libre, o tras timeout segundos inactiva.
+    """
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+    poll_interval = 0.05
+    # Cabeceras y cuerpo van en escrituras separadas; sin esto Nagle las retiene
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self.wait_next_request():
+            self.handle_one_request()
+
+    def wait_next_request(self):
+        """True cuando llega otra petición, False si hay que liberar el hilo"""
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if not self.server.pending.empty():
+                return False
+            readable, _, _ = select.select([self.connection], [], [], self.poll_interval)
+            if readable:
+                return True
+        return False
+
+class PooledXMLRPCServer(SimpleXMLRPCServer):
+    """SimpleXMLRPCServer que atiende cada conexión en un pool acotado de hilos
+
+    max_connections limita las conexiones en curso (atendiéndose o esperando
+    un hilo libre); por encima de ese límite la conexión se rechaza con un
+    503 sin llegar a leer la petición, en lugar de acumularse sin fin.
+    """
+    request_queue_size = 128
+
+    def __init__(self, addr, workers=16, max_connections=64, **kwargs):
+        super().__init__(addr, **kwargs)
+        self.pending = queue.Queue()
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.rejected = 0
+        # Hilos daemon: una conexión keep-alive inactiva no debe retrasar la salida del proceso
+        self.workers = [threading.Thread(target=self.process_requests, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            self.rejected += 1
+            self.reject_request(request)
+            return
+        self.pending.put((request, client_address))
+
+    def process_requests(self):
+        """Worker: atiende conexiones de la cola hasta recibir None"""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self.slots.release()
+
+    def reject_request(self, request):
+        try:
+            request.sendall(b"HTTP/1.0 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        for _ in self.workers:
+            self.pending.put(None)
+
+
+def create_server(host, port, workers=0, max_connections=64):
+    """Servidor secuencial de siempre con workers=0, si no uno con un pool de workers hilos
+
+    Ambos registran system.multicall para que los clientes puedan agrupar llamadas.
+    """
+    if workers:
+        server = PooledXMLRPCServer((host, port), workers, max_connections, requestHandler=KeepAliveRequestHandler,
+                                    allow_none=True, logRequests=False)
+    else:
+        server = SimpleXMLRPCServer((host, port), requestHandler=RequestHandler, allow_none=True, logRequests=False)
+    server.register_multicall_functions()
+    return server
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from multiprocessing import Process
+from pathlib import Path
+
+from matplotlib import pyplot as plt
+
+from clients.redis.async_insult_filter_client import AsyncInsultFilterRedisClient
+from clients.redis.async_insult_service_client import AsyncInsultServiceRedisClient
+from servers.redis.insult_filter import run_server as filt_redis_run_server
+from servers.redis.insult_service import run_server as serv_redis_run_server
+from stress_tests.test_utils.docker_container_manager import DockerContainerManager
+
+
+class AsyncClientStressTester:
+    """Drive a server from one event loop with an increasing number of requests in flight"""
+    def __init__(self, process, client_class, total_requests=20000):
+        self.server_process = process
+        self.client_class = client_class
+        self.total_requests = total_requests
+
+    async def client_work(self, in_flight):
+        client = self.client_class()
+        semaphore = asyncio.Semaphore(in_flight)
+
+        async def one_request(i):
+            async with semaphore:
+                if 'InsultFilter' in self.client_class.__name__:
+                    await client.submit_text("insult idiot retardet")
+                else:
+                    await client.add_insult(f"insult{i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request(i) for i in range(self.total_requests)))
+        elapsed = time.perf_counter() - start
+        await client.close()
+        return elapsed
+
+    def run_stress_test(self, in_flight_counts=(1, 10, 100, 1000, 5000)):
+        self.server_process.start()
+        time.sleep(1)
+
+        throughputs = []
+        for in_flight in in_flight_counts:
+            elapsed = asyncio.run(self.client_work(in_flight))
+            throughputs.append(self.total_requests / elapsed)
+            print(f"  {in_flight} in flight: {throughputs[-1]:.2f} req/s")
+
+        self.server_process.terminate()
+        self.plot_results(in_flight_counts, throughputs)
+
+    def plot_results(self, in_flight_counts, throughputs):
+        plt.figure(figsize=(8, 5))
+        plt.plot(in_flight_counts, throughputs, 'b-o')
+        plt.xscale('log')
+        plt.title(f"{self.client_class.__name__} throughput vs requests in flight")
+        plt.xlabel("Requests in flight (one event loop)")
+        plt.ylabel("Requests per Second")
+        plt.grid(True)
+
+        plt.tight_layout()
+        path = Path(__file__).parent.parent.parent
+        path = path / "plots/single_node_tests/async_clients"
+        Path(path).mkdir(parents=True, exist_ok=True)
+        plt.savefig(f"{path}/async_test_{self.client_class.__name__}.png")
+
+
+if __name__ == "__main__":
+    manager = DockerContainerManager()
+    manager.stop_container('redis')
+    manager.run_redis()
+
+    for target, client in [(serv_redis_run_server, AsyncInsultServiceRedisClient),
+                           (filt_redis_run_server, AsyncInsultFilterRedisClient)]:
+        print(f"Testing redis using {client.__name__} (single event loop) ...")
+        tester = AsyncClientStressTester(Process(target=target), client)
+        tester.run_stress_test()
+
+    manager.stop_container('redis')
@@ -0,0 +1,78 @@
+import threading
+import time
+from functools import partial
+from multiprocessing import Process
+from pathlib import Path
+
+from matplotlib import pyplot as plt
+
+from clients.xmlrpc.insult_service_client import InsultServiceXMLRPCClient
+from clients.xmlrpc.transport import PooledTransport
+from servers.xmlrpc.insult_service import run_server
+from stress_tests.test_utils.functions import get_free_port
+
+
+class TimedSubscriber(InsultServiceXMLRPCClient):
+    """Cliente que anota cuándo le llega cada insulto en lugar de imprimirlo"""
+    def __init__(self, deliveries, *args, **kwargs):
+        self.deliveries = deliveries
+        super().__init__(*args, **kwargs)
+
+    def notify(self, insult: str):
+        self.deliveries.append(time.perf_counter())
+
+
+class BroadcastTester:
+    """Mide cuánto tarda una ronda de difusión en llegar a todos los subscriptores de un proceso"""
+    def __init__(self, interval=5):
+        self.interval = interval
+
+    def measure(self, subscribers):
+        port = get_free_port()
+        process = Process(target=partial(run_server, port=port, workers=16), daemon=True)
+        process.start()
+        time.sleep(1)
+
+        deliveries = []
+        transport = PooledTransport()
+        clients = [TimedSubscriber(deliveries, server_port=port, transport=transport) for _ in range(subscribers)]
+        clients[0].add_insult("idiot")
+
+        # Espera a una ronda completa y mide desde la primera entrega hasta la última
+        deadline = time.time() + 3 * self.interval
+        while len(deliveries) < subscribers and time.time() < deadline:
+            time.sleep(0.1)
+        first_round = sorted(deliveries)[:subscribers]
+        spread = first_round[-1] - first_round[0] if first_round else 0
+
+        for client in clients:
+            client.close()
+        process.terminate()
+        return spread, len(first_round), threading.active_count()
+
+    def run(self, subscriber_counts=(10, 100, 500, 1000)):
+        spreads = []
+        for subscribers in subscriber_counts:
+            spread, delivered, threads = self.measure(subscribers)
+            spreads.append(spread)
+            print(f"{subscribers} subscribers: round delivered to {delivered} in {spread:.3f} s, "
+                  f"{threads} threads in the client process")
+        self.plot_results(subscriber_counts, spreads)
+
+    def plot_results(self, subscriber_counts, spreads):
+        plt.figure(figsize=(8, 5))
+        plt.plot(subscriber_counts, spreads, 'b-o')
+        plt.title("Broadcast round latency vs Subscribers")
+        plt.xlabel("Subscribers (one process, shared receiver)")
+        plt.ylabel("First to last delivery (s)")
+        plt.grid(True)
+
+        plt.tight_layout()
+        path = Path(__file__).parent.parent.parent
+        path = path / "plots/single_node_tests/insult_service"
+        Path(path).mkdir(parents=True, exist_ok=True)
+        plt.savefig(f"{path}/xmlrpc_broadcast.png")
+
+
+if __name__ == "__main__":
+    BroadcastTester().run()
@@ -0,0 +1,92 @@
+import json
+import time
+from pathlib import Path
+
+from matplotlib import pyplot as plt
+
+from common.codec import CODECS, codec_for, get_codec
+
+
+class LegacyJsonCodec:
+    """Wire format before the codec layer: json.dumps text, UTF-8 decoded by decode_responses first"""
+    name = 'json (decode_responses)'
+
+    def encode(self, obj):
+        return json.dumps(obj).encode()
+
+    def decode(self, data):
+        return json.loads(data.decode())
+
+    def pack(self, obj):
+        return self.encode(obj), None
+
+
+class CodecTester:
+    def __init__(self, repeat=20):
+        self.repeat = repeat
+        self.codecs = [LegacyJsonCodec()]
+        for name in CODECS:
+            try:
+                self.codecs.append(get_codec(name))
+            except ImportError as e:
+                print(f"Skipping {name}: {e}")
+
+    @staticmethod
+    def payloads(size):
+        """Replies as sent over the wire for a large get_results and get_all_insults, plus one long text"""
+        results = [f"Hello world CENSORED number {i}, what a CENSORED day" for i in range(size)]
+        insults = [f"insult{i}" for i in range(size)]
+        return {
+            'get_results': {'correlation_id': 'c' * 32, 'response': {'status': 'success', 'results': results}},
+            'get_all_insults': {'correlation_id': 'c' * 32, 'response': {'status': 'success', 'results': insults}},
+            'submit_text': " ".join(results),
+        }
+
+    def measure(self, codec, payload):
+        """(encode µs, decode µs, bytes) averaged over repeat runs"""
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            data, content_type = codec.pack(payload)
+        encode = (time.perf_counter() - start) / self.repeat
+        # The receiver picks the decoder from the content type, as the RabbitMQ handlers do
+        decoder = codec_for(content_type) if content_type else codec
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            decoder.decode(data)
+        decode = (time.perf_counter() - start) / self.repeat
+        return encode * 1e6, decode * 1e6, len(data)
+
+    def run(self, size=10000):
+        results = {}
+        for payload_name, payload in self.payloads(size).items():
+            results[payload_name] = {}
+            for codec in self.codecs:
+                encode, decode, size_bytes = self.measure(codec, payload)
+                results[payload_name][codec.name] = (encode, decode, size_bytes)
+                print(f"{payload_name} {codec.name}: encode {encode:.0f} µs, decode {decode:.0f} µs, "
+                      f"{size_bytes} bytes")
+        self.plot_results(size, results)
+
+    def plot_results(self, size, results):
+        plt.figure(figsize=(15, 5 * len(results)))
+        for row, (payload_name, by_codec) in enumerate(results.items()):
+            names = list(by_codec)
+            for col, (title, unit) in enumerate([("Encode", "µs"), ("Decode", "µs"), ("Size", "bytes")]):
+                plt.subplot(len(results), 3, row * 3 + col + 1)
+                plt.bar(names, [by_codec[name][col] for name in names])
+                plt.title(f"{title} {payload_name} ({size} items)")
+                plt.ylabel(unit)
+                plt.xticks(rotation=20)
+                plt.grid(True, axis='y')
+
+        plt.tight_layout()
+        path = Path(__file__).parent.parent.parent
+        path = path / "plots/micro_benchmarks/codec"
+        Path(path).mkdir(parents=True, exist_ok=True)
+        plt.savefig(f"{path}/codec_{size}.png")
+
+
+if __name__ == "__main__":
+    tester = CodecTester()
+    for size in [1_000, 100_000]:
+        tester.run(size)
@@ -14,8 +14,9 @@ from stress_tests.test_utils.docker_container_manager import DockerContainerMana
 
 
 def process_task(args):
-    client_id, text, host, port, processing_time, lock, latencies = args
-    client = InsultFilterRabbitMQClient(host, port)
+    client_id, text, host, port, processing_time, lock, latencies, pooled = args
+    # Pooled clients reuse the worker process' connection and direct reply-to consumer
+    client = InsultFilterRabbitMQClient(host, port, direct_reply_to=pooled, pooled=pooled)
     try:
         start_time = time.perf_counter()
         response = client.submit_text(text)
@@ -32,7 +33,8 @@ def process_task(args):
         client.close()
 
 class DynamicMultinodeTester:
-    def __init__(self):
+    def __init__(self, pooled=True):
+        self.pooled = pooled
         self.servers_manager = ServersManager(run_server)
         self.rabbitmq_monitor = RabbitmqMonitor()
         self.dynamic_scaler = DynamicScaler(self.rabbitmq_monitor, self.servers_manager)
@@ -56,7 +58,8 @@ class DynamicMultinodeTester:
                 tasks = []
                 for i in range(requests):
                     client_id = i % clients
-                    tasks.append((client_id, "Hola", host, port, self.processing_time, self.lock, self.latencies))
+                    tasks.append((client_id, "Hola", host, port, self.processing_time, self.lock, self.latencies,
+                                  self.pooled))
 
                 start_time = time.perf_counter()
                 with Pool(processes=clients) as pool:
@@ -135,11 +138,12 @@ class DynamicMultinodeTester:
         path = Path(__file__).parent.parent.parent
         path = path / "plots/dynamic_node_tests/insult_filter"
         Path(path).mkdir(parents=True, exist_ok=True)
-        plt.savefig(f"{path}/dynamic_node_test.png")
+        plt.savefig(f"{path}/dynamic_node_test{'' if self.pooled else '_unpooled'}.png")
 
 if __name__ == "__main__":
     node_manager = DockerContainerManager()
     node_manager.run_rabbitmq()
-    test = DynamicMultinodeTester()
-    test.run_stress_test([(10, 200), (10, 200), (100, 500),(100, 1000), (500, 10000), (500, 15000), (500, 5000), (100, 1000), (10, 200)])
+    for pooled in [True, False]:
+        test = DynamicMultinodeTester(pooled)
+        test.run_stress_test([(10, 200), (10, 200), (100, 500),(100, 1000), (500, 10000), (500, 15000), (500, 5000), (100, 1000), (10, 200)])
     node_manager.stop_container('rabbitmq')
\ No newline at end of file
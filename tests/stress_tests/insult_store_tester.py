@@ -0,0 +1,68 @@
+import time
+from pathlib import Path
+
+from matplotlib import pyplot as plt
+
+from servers.base.insult_store import InsultStore
+
+
+class ListStore:
+    """Store used by the services before InsultStore: membership check on a plain list"""
+    def __init__(self, insults=()):
+        # Prefilled without the membership check: the tester's insults are unique
+        # and checking each one would make the prefill quadratic
+        self.items = list(insults)
+
+    def add(self, insult):
+        if insult not in self.items:
+            self.items.append(insult)
+            return True
+        return False
+
+
+class InsultStoreTester:
+    def __init__(self, store_classes, batch=1000):
+        self.store_classes = store_classes
+        self.batch = batch
+
+    def measure_add_throughput(self, store_class, size):
+        """Adds/s of a batch of new insults into a store that already holds size insults"""
+        store = store_class(f"insult{i}" for i in range(size))
+
+        start = time.perf_counter()
+        for i in range(size, size + self.batch):
+            store.add(f"insult{i}")
+        return self.batch / (time.perf_counter() - start)
+
+    def run(self, sizes):
+        results = {}
+        for store_class in self.store_classes:
+            results[store_class.__name__] = []
+            for size in sizes:
+                throughput = self.measure_add_throughput(store_class, size)
+                results[store_class.__name__].append(throughput)
+                print(f"{store_class.__name__} size={size}: {throughput:.0f} adds/s")
+        self.plot_results(sizes, results)
+
+    def plot_results(self, sizes, results):
+        plt.figure(figsize=(8, 5))
+        for name, throughputs in results.items():
+            plt.plot(sizes, throughputs, 'o-', label=name)
+        plt.xscale('log')
+        plt.yscale('log')
+        plt.title("add_insult throughput vs store size")
+        plt.xlabel("Insults already stored")
+        plt.ylabel("Adds per second")
+        plt.legend()
+        plt.grid(True)
+
+        plt.tight_layout()
+        path = Path(__file__).parent.parent.parent
+        path = path / "plots/micro_benchmarks/insult_store"
+        Path(path).mkdir(parents=True, exist_ok=True)
+        plt.savefig(f"{path}/insult_store_add_throughput.png")
+
+
+if __name__ == "__main__":
+    tester = InsultStoreTester([InsultStore, ListStore])
+    tester.run([1_000, 10_000, 100_000, 1_000_000])
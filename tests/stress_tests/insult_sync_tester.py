@@ -0,0 +1,60 @@
+import time
+from functools import partial
+from multiprocessing import Process
+
+from clients.pyro.insult_filter_client import InsultFilterPyroClient
+from clients.pyro.insult_service_client import InsultServicePyroClient
+from servers.pyro.insult_filter import run_server as filt_pyro_run_server
+from servers.pyro.insult_service import run_server as serv_pyro_run_server
+from stress_tests.test_utils.docker_container_manager import DockerContainerManager
+
+
+class InsultSyncTester:
+    """Comprueba que el filtro Pyro censura los insultos añadidos en el servicio Pyro y mide cuánto tarda"""
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.processes = []
+
+    def start_servers(self):
+        """Inicia el servicio y un filtro sincronizado con él"""
+        self.processes = [Process(target=serv_pyro_run_server, daemon=True),
+                          Process(target=partial(filt_pyro_run_server, service_ns="pyro.insult_service"), daemon=True)]
+        for process in self.processes:
+            process.start()
+        time.sleep(2)
+
+    def stop_servers(self):
+        for process in self.processes:
+            process.terminate()
+
+    def measure_sync_lag(self, service, insult_filter, insult):
+        """Segundos desde add_insult hasta que el filtro censura el nuevo insulto"""
+        service.add_insult(insult)
+        start = time.perf_counter()
+        while time.perf_counter() - start < self.timeout:
+            ticket = insult_filter.submit_text(f"you {insult}")
+            if insult not in insult_filter.wait_result(ticket, self.timeout):
+                return time.perf_counter() - start
+            time.sleep(0.05)
+        raise AssertionError(f"Filter did not pick up '{insult}' within {self.timeout} s")
+
+    def run(self, rounds=10):
+        self.start_servers()
+        try:
+            service, insult_filter = InsultServicePyroClient(), InsultFilterPyroClient()
+            # Sufijo final para que ningún insulto sea prefijo de otro
+            lags = [self.measure_sync_lag(service, insult_filter, f"numpty_{i}_") for i in range(rounds)]
+            print(f"Pyro filter synced {rounds} new insults: "
+                  f"mean {sum(lags) / rounds:.3f} s, max {max(lags):.3f} s")
+        finally:
+            self.stop_servers()
+
+
+if __name__ == "__main__":
+    manager = DockerContainerManager()
+    manager.stop_container('pyro-ns')
+    manager.run_pyro_nameserver()
+
+    InsultSyncTester().run()
+
+    manager.stop_container('pyro-ns')
@@ -9,12 +9,15 @@ from matplotlib import pyplot as plt
 
 from stress_tests.test_utils.docker_container_manager import DockerContainerManager
 from stress_tests.test_utils.server_client import server_client
-from stress_tests.test_utils.functions import get_free_port, filter_work, service_work
+from stress_tests.test_utils.functions import filter_work, service_work, \
+    pipelined_filter_work, pipelined_service_work
 
 class SingleNodeStressTester:
-    def __init__(self, process, client_class):
+    def __init__(self, process, client_class, pipelined=False):
         self.server_process = process
         self.client_class = client_class
+        self.pipelined = pipelined
+        self.label = client_class.__name__ + ("Pipelined" if pipelined else "")
 
     def start_server(self):
         """Inicia el servidor en un proceso separado"""
@@ -79,13 +82,12 @@ class SingleNodeStressTester:
 
     def client_work(self, latencies, client_class, requests_per_client):
         try:
-            client = client_class(
-                cli_port=get_free_port()) if client_class.__name__ == 'InsultServiceXMLRPCClient' else client_class()
+            client = client_class()
             start = time.perf_counter()
             if 'InsultFilter' in client_class.__name__:
-                filter_work(client, requests_per_client)
+                (pipelined_filter_work if self.pipelined else filter_work)(client, requests_per_client)
             else:
-                service_work(client, requests_per_client)
+                (pipelined_service_work if self.pipelined else service_work)(client, requests_per_client)
             latencies.append(time.perf_counter() - start)
         except Exception as e:
             print(f"Error conn {e}")
@@ -136,7 +138,7 @@ class SingleNodeStressTester:
             if 'InsultFilter' in self.client_class.__name__ \
             else path / "plots/single_node_tests/insult_service/resources"
         Path(path).mkdir(parents=True, exist_ok=True)
-        plt.savefig(f"{path}/resources_single_node_test_{self.client_class.__name__}.png")
+        plt.savefig(f"{path}/resources_single_node_test_{self.label}.png")
 
     def plot_results(self, client_counts, results):
         """Genera gráficos con los resultados"""
@@ -163,7 +165,7 @@ class SingleNodeStressTester:
         path = path / "plots/single_node_tests/insult_filter" \
             if 'InsultFilter' in self.client_class.__name__ else path / "plots/single_node_tests/insult_service"
         Path(path).mkdir(parents=True, exist_ok=True)
-        plt.savefig(f"{path}/single_node_test_{self.client_class.__name__}.png")
+        plt.savefig(f"{path}/single_node_test_{self.label}.png")
 
     def measure_resources(self, duration_sec=1):
         """Mide CPU, RAM, disco y red durante un período."""
@@ -223,4 +225,11 @@ if __name__ == "__main__":
             tester = SingleNodeStressTester(Process(target=data['targets'][idx]), client)
             tester.run_stress_test(max_clients=50, requests_per_client=50)
 
+    # Redis and RabbitMQ clients match replies by correlation id, so they can keep every request in flight
+    for key in ['redis', 'rabbitMQ']:
+        for idx, client in enumerate(server_client[key]['clients']):
+            print(f"Testing {key} using {client.__name__} pipelined (single node) ...")
+            tester = SingleNodeStressTester(Process(target=server_client[key]['targets'][idx]), client, True)
+            tester.run_stress_test(max_clients=50, requests_per_client=50)
+
     stop_containers()
\ No newline at end of file
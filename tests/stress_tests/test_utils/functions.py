@@ -15,3 +15,13 @@ def service_work(client, requests_per_client):
 def filter_work(client, requests_per_client):
     for i in range(requests_per_client):
         client.submit_text("insult idiot retardet")
+
+def pipelined_service_work(client, requests_per_client):
+    futures = [client.add_insult_async(f"insult{i}") for i in range(requests_per_client)]
+    for future in futures:
+        future.result()
+
+def pipelined_filter_work(client, requests_per_client):
+    futures = [client.submit_text_async("insult idiot retardet") for _ in range(requests_per_client)]
+    for future in futures:
+        future.result()
@@ -0,0 +1,108 @@
+import socket
+import threading
+import time
+from functools import partial
+from multiprocessing import Process
+from pathlib import Path
+from xmlrpc.client import ServerProxy
+
+from matplotlib import pyplot as plt
+
+from clients.xmlrpc.transport import PooledTransport
+from servers.xmlrpc.insult_filter import run_server
+from stress_tests.test_utils.functions import get_free_port
+
+
+class XMLRPCServerTester:
+    """Compara el servidor XML-RPC secuencial con el de pool de hilos bajo clientes concurrentes"""
+    def __init__(self, workers=16, max_connections=64, slow_client=True):
+        self.workers = workers
+        self.max_connections = max_connections
+        self.slow_client = slow_client
+
+    def start_server(self, workers):
+        port = get_free_port()
+        process = Process(target=partial(run_server, port=port, workers=workers,
+                                         max_connections=self.max_connections), daemon=True)
+        process.start()
+        time.sleep(1)
+        return process, f"http://127.0.0.1:{port}"
+
+    @staticmethod
+    def hold_connection(url, seconds):
+        """Cliente lento: envía la cabecera HTTP a trozos, ocupando la conexión"""
+        host, port = url.split("//")[1].split(":")
+        with socket.create_connection((host, int(port))) as sock:
+            for byte in b"POST /RPC2 HTTP/1.0\r\n":
+                sock.send(bytes([byte]))
+                time.sleep(seconds / 21)
+
+    @staticmethod
+    def client_work(url, requests_per_client, latencies, errors, keep_alive):
+        proxy = ServerProxy(url, allow_none=True, transport=PooledTransport() if keep_alive else None)
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            try:
+                proxy.submit_text("insult idiot retardet")
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors.append(1)
+        proxy("close")()
+
+    def measure(self, url, clients, requests_per_client, keep_alive):
+        latencies, errors = [], []
+        slow = None
+        if self.slow_client:
+            slow = threading.Thread(target=self.hold_connection, args=(url, 2), daemon=True)
+            slow.start()
+            time.sleep(0.1)
+        threads = [threading.Thread(target=self.client_work, args=(url, requests_per_client, latencies, errors,
+                                                                        keep_alive))
+                   for _ in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if slow:
+            slow.join()
+        return len(latencies) / elapsed, sum(latencies) / len(latencies) if latencies else 0, len(errors)
+
+    def run_stress_test(self, client_counts=(10, 20, 30, 40, 50), requests_per_client=50):
+        results = {}
+        modes = [("SimpleXMLRPCServer", 0, False),
+                 (f"Pooled ({self.workers} workers)", self.workers, False),
+                 (f"Pooled ({self.workers} workers) + keep-alive", self.workers, True)]
+        for label, workers, keep_alive in modes:
+            process, url = self.start_server(workers)
+            results[label] = []
+            for clients in client_counts:
+                throughput, latency, errors = self.measure(url, clients, requests_per_client, keep_alive)
+                results[label].append((throughput, latency))
+                print(f"{label} {clients} clients: {throughput:.2f} req/s, {latency:.4f} s, {errors} rejected/failed")
+            process.terminate()
+        self.plot_results(client_counts, results)
+
+    def plot_results(self, client_counts, results):
+        plt.figure(figsize=(12, 5))
+        for col, title, unit in [(0, "Throughput vs Clients", "Requests per Second"),
+                                 (1, "Latency vs Clients", "Average Latency (s)")]:
+            plt.subplot(1, 2, col + 1)
+            for label, values in results.items():
+                plt.plot(client_counts, [v[col] for v in values], 'o-', label=label)
+            plt.title(title)
+            plt.xlabel("Number of Clients")
+            plt.ylabel(unit)
+            plt.legend()
+            plt.grid(True)
+
+        plt.tight_layout()
+        path = Path(__file__).parent.parent.parent
+        path = path / "plots/single_node_tests/insult_filter"
+        Path(path).mkdir(parents=True, exist_ok=True)
+        plt.savefig(f"{path}/xmlrpc_pooled_server.png")
+
+
+if __name__ == "__main__":
+    XMLRPCServerTester().run_stress_test()